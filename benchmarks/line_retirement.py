@@ -0,0 +1,54 @@
+""" Time one frame of display_normal_scrolling as line_list grows.
+
+Every line on the screen is one step away from finishing so the whole
+list is retired in the timed frame. The time per line should stay flat
+as the number of lines goes up. Needs pymatrix installed, for example
+with pip install -e .
+
+    python benchmarks/line_retirement.py
+"""
+import time
+
+from pymatrix import pymatrix
+
+HEIGHT = 40
+ROUNDS = 5
+
+
+def finishing_lines(count: int, width: int) -> list:
+    lines = []
+    for number in range(count):
+        line = pymatrix.SingleLine(0, number % width, width, HEIGHT, "down")
+        line.lead_y = HEIGHT
+        line.y = HEIGHT
+        line.last_y = line.height
+        lines.append(line)
+    return lines
+
+
+def time_frame(count: int) -> float:
+    width = max(count, 80)
+    args = pymatrix.argument_parsing(["--benchmark", "1",
+                                      "--size", f"{width}x{HEIGHT}"])
+    matrix = pymatrix.Matrix(pymatrix.NullRenderer(HEIGHT, width), args)
+    best = None
+    for _ in range(ROUNDS):
+        matrix.line_list = finishing_lines(count, width)
+        start = time.perf_counter()
+        matrix.display_normal_scrolling()
+        elapsed = time.perf_counter() - start
+        assert not matrix.line_list
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main() -> None:
+    print(f"{'lines':>8}{'frame ms':>12}{'us per line':>14}")
+    for count in [250, 500, 1000, 2000, 4000, 8000]:
+        elapsed = time_frame(count)
+        print(f"{count:>8}{elapsed * 1000:>12.3f}"
+              f"{elapsed / count * 1000000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
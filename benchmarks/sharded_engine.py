@@ -0,0 +1,51 @@
+""" Frames per second of the arrays engine by number of worker processes.
+
+Runs the headless benchmark on a very large screen with the arrays engine
+in the main process and then with --workers 1, 2, 4 and so on up to the
+number of CPUs. There is only a speed up with more than one CPU. Needs
+pymatrix installed, for example with pip install -e .
+
+    python benchmarks/sharded_engine.py [WIDTHxHEIGHT] [FRAMES]
+"""
+import os
+import sys
+
+from pymatrix import pymatrix
+
+SIZE = "1600x400"
+FRAMES = 600
+
+
+def frames_per_second(size: str, frames: int, workers: int) -> float:
+    test_args = ["--benchmark", str(frames), "--size", size,
+                 "--engine", "arrays", "--seed", "1"]
+    if workers:
+        test_args += ["--workers", str(workers)]
+    args = pymatrix.argument_parsing(test_args)
+    width, height = args.size
+    matrix = pymatrix.Matrix(pymatrix.NullRenderer(height, width), args)
+    return len(matrix.stats.frame_times) / sum(matrix.stats.frame_times)
+
+
+def worker_counts() -> list:
+    counts = [0, 1]
+    while counts[-1] * 2 <= max(os.cpu_count() or 1, 4):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def main() -> None:
+    size = sys.argv[1] if len(sys.argv) > 1 else SIZE
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else FRAMES
+    print(f"screen {size}, {frames} frames, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'fps':>10}{'speed up':>10}")
+    baseline = None
+    for workers in worker_counts():
+        fps = frames_per_second(size, frames, workers)
+        baseline = baseline or fps
+        label = workers or "none"
+        print(f"{label:>8}{fps:>10.1f}{fps / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
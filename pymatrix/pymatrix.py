@@ -1,20 +1,40 @@
 #! /usr/bin/python3
 """ Matrix style rain using Python 3 and curses. """
+import abc
 import argparse
+import array
+import asyncio
+import collections
+import cProfile
 import curses
-import datetime
+import functools
 import importlib.metadata
 import itertools
+import multiprocessing
 import os
 import random
+import select
+import selectors
+import signal
+import sys
+import threading
 import time
+import unicodedata
+import zlib
 
+from multiprocessing import shared_memory
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
 from typing import Union
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 
 version = importlib.metadata.version("pymatrix-rain")
 
@@ -72,8 +92,21 @@ DEFAULT_BG_CHAR = " "
 DEFAULT_CYCLE_COLOR_DELAY = 500
 WAKE_UP_PAIR = 21
 WAKE_UP_KEYS = [119, 65, 107, 101]
+MAX_KEYS_PER_FRAME = 256
+# keys that set a value, in a run of them only the last one matters
+LAST_KEY_WINS = [frozenset(range(48, 58)),  # delay 0 to 9
+                 frozenset([258, 259, 260, 261]),  # arrows
+                 frozenset(CURSES_CH_CODES_CYCLE_DELAY)]
+# keys that do the same thing when pressed again
+REPEAT_KEYS = frozenset([4, 66, 68, 78, 90, 98, 100, 110, 122] +
+                        list(CURSES_CH_CODES_COLOR))
+KEY_WOKEN = -2  # wait_key was woken by SIGCONT instead of a key
 MIN_SCREEN_SIZE_Y = 10
 MIN_SCREEN_SIZE_X = 10
+BACKENDS = ["curses", "ansi", "null", "record"]
+ENGINES = ["lines", "arrays", "numpy"]
+# the glyph grid of ShardedEngine holds code points in native byte order
+GRID_ENCODING = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
 
 
 class PyMatrixError(Exception):
@@ -82,6 +115,11 @@ class PyMatrixError(Exception):
 
 class SingleLine:
     def __init__(self, y: int, x: int, width: int, height: int, direction: str):
+        self.reset(y, x, width, height, direction)
+
+    def reset(self, y: int, x: int, width: int, height: int,
+              direction: str) -> None:
+        """ Start the line over. Used to reuse retired lines. """
         self.direction = direction
         self.height = height - 2
         self.width = width - 1
@@ -235,9 +273,20 @@ class SingleLine:
 
 
 class OldScrollingLine:
+    """
+    The whole trail scrolls down one row a frame with its glyphs fixed.
+    The glyphs are kept in a ring, oldest (lowest) first, and top is the
+    row of the newest glyph so moving the trail is O(1). The glyph at
+    position i of the ring is on row top + len(trail) - 1 - i.
+    """
     old_scroll_chr_list = []
 
     def __init__(self, x: int, width: int, height: int):
+        self.trail = collections.deque()
+        self.reset(x, width, height)
+
+    def reset(self, x: int, width: int, height: int) -> None:
+        """ Start the line over. Used to reuse retired lines. """
         self.height = height - 2
         self.width = width - 1
         self.y = -1
@@ -245,17 +294,29 @@ class OldScrollingLine:
         self.length = random.randint(3, height - 3)
         self.lead_y = 0
         self.lead_char = random.choice(OldScrollingLine.old_scroll_chr_list)
-        self.location_list = []
+        self.trail.clear()
+        self.top = 0
         self.line_color_number = random.randint(1, 7)
         self.bold = True if random.randint(1, 3) <= 1 else False
 
+    @property
+    def location_list(self) -> List[List]:
+        """ The trail as [y, x, glyph] cells, oldest first. """
+        y = self.top + len(self.trail) - 1
+        return [[y - i, self.x, glyph] for i, glyph in enumerate(self.trail)]
+
+    @location_list.setter
+    def location_list(self, cells: List[List]) -> None:
+        self.trail = collections.deque(cell[2] for cell in cells)
+        self.top = cells[-1][0] if cells else 0
+
     @classmethod
-    def update_char_list(cls, updated_char_list: List[str]) -> None:
+    def update_char_list(cls, updated_char_list: Sequence[str]) -> None:
         OldScrollingLine.old_scroll_chr_list = updated_char_list
 
     def delete_last(self) -> Union[None, List[int]]:
-        if len(self.location_list) == self.length or self.y >= self.length:
-            return self.location_list[-1][0:2]
+        if len(self.trail) == self.length or self.y >= self.length:
+            return [self.top, self.x]
         else:
             return None
 
@@ -267,36 +328,1718 @@ class OldScrollingLine:
         else:
             return None
 
-    def get_next(self) -> List[List]:
-        if len(self.location_list) != 0 and self.y >= 0:
-            for cell in self.location_list:
-                cell[0] += 1
-        if len(self.location_list) < self.length and 0 <= self.y < self.height:
-            self.location_list.append(
-                [0, self.x, random.choice(OldScrollingLine.old_scroll_chr_list)]
-            )
+    def advance(self) -> None:
+        """ Move the trail down a row, adding and dropping glyphs. """
+        trail = self.trail
+        if trail and self.y >= 0:
+            self.top += 1
+        if len(trail) < self.length and 0 <= self.y < self.height:
+            trail.append(random.choice(OldScrollingLine.old_scroll_chr_list))
+            self.top = 0
         if self.y > self.height:
-            self.location_list.pop(0)
+            trail.popleft()
         self.y += 1
+
+    def get_next(self) -> List[List]:
+        self.advance()
         return self.location_list
 
     def okay_to_delete(self) -> bool:
-        return len(self.location_list) == 0 and self.y > self.height
+        return len(self.trail) == 0 and self.y > self.height
+
+
+class LinePool:
+    """
+    Keeps retired SingleLine and OldScrollingLine objects and starts them
+    over instead of making new ones, so a long run does not keep handing
+    lines to the garbage collector.
+    """
+    MAX_FREE = 1024  # per kind of line
+
+    def __init__(self):
+        self.free_lines = []
+        self.free_old_lines = []
+        self.hits = 0
+        self.misses = 0
+
+    def single_line(self, y: int, x: int, width: int, height: int,
+                    direction: str) -> SingleLine:
+        if self.free_lines:
+            self.hits += 1
+            line = self.free_lines.pop()
+            line.reset(y, x, width, height, direction)
+            return line
+        self.misses += 1
+        return SingleLine(y, x, width, height, direction)
+
+    def old_scrolling_line(self, x: int, width: int,
+                           height: int) -> OldScrollingLine:
+        if self.free_old_lines:
+            self.hits += 1
+            line = self.free_old_lines.pop()
+            line.reset(x, width, height)
+            return line
+        self.misses += 1
+        return OldScrollingLine(x, width, height)
+
+    def release(self, lines: Sequence) -> None:
+        """ Take back lines that are no longer on the screen. """
+        for line in lines:
+            if isinstance(line, OldScrollingLine):
+                free = self.free_old_lines
+            else:
+                free = self.free_lines
+            if len(free) < self.MAX_FREE:
+                free.append(line)
+
+    def report(self) -> str:
+        return "\n".join([f"line pool hits: {self.hits}",
+                          f"line pool misses: {self.misses}"])
+
+
+class ColumnPool:
+    """
+    The columns free for a new stream. Taking a random column, giving one
+    back and checking if one is free are all O(1). The columns are kept in
+    a list with a column to position map and a column is removed by moving
+    the last one into its place.
+    """
+    def __init__(self, columns: Sequence[int] = ()):
+        self.columns = []
+        self.position = {}
+        self.spacing = 1
+        self.reset(columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __contains__(self, column: int) -> bool:
+        return column in self.position
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def reset(self, columns: Sequence[int], spacing: int = 1) -> None:
+        """
+        Columns given back by release that are not a multiple of spacing
+        are dropped. Used to space out the columns while streams started
+        in the other columns are still running.
+        """
+        self.columns = list(columns)
+        self.position = {column: i for i, column in enumerate(self.columns)}
+        self.spacing = spacing
+
+    def acquire(self) -> int:
+        """ Take a random free column. """
+        column = random.choice(self.columns)
+        self.remove(column)
+        return column
+
+    def remove(self, column: int) -> None:
+        index = self.position.pop(column)
+        last = self.columns.pop()
+        if last != column:
+            self.columns[index] = last
+            self.position[last] = index
+
+    def release(self, column: int) -> None:
+        if column % self.spacing == 0 and column not in self.position:
+            self.position[column] = len(self.columns)
+            self.columns.append(column)
+
+
+class FrameBuffer:
+    """
+    Shadow copy of the screen. The rain writes cells into the buffer and
+    flush only sends the cells that changed since the last flush.
+    """
+    def __init__(self, height: int, width: int, bg_char: str = DEFAULT_BG_CHAR):
+        self.height = height
+        self.width = width
+        self.glyphs = []
+        self.attrs = []
+        self.front_glyphs = []
+        self.front_attrs = []
+        self.dirty = []
+        self.cells_written = 0
+        self.spans_written = 0
+        self.clear(bg_char)
+
+    def clear(self, bg_char: str = DEFAULT_BG_CHAR) -> None:
+        """ Reset to a blank screen. Use after the screen has been cleared. """
+        size = self.height * self.width
+        self.glyphs = [bg_char] * size
+        self.attrs = [0] * size
+        self.front_glyphs = [bg_char] * size
+        self.front_attrs = [0] * size
+        self.dirty = []
+
+    def invalidate(self, bg_char: str = DEFAULT_BG_CHAR) -> None:
+        """
+        Send every cell that is not blank on the next flush. Use after the
+        screen has been cleared behind the buffer's back.
+        """
+        front_glyphs = self.front_glyphs
+        front_attrs = self.front_attrs
+        for index, glyph in enumerate(front_glyphs):
+            if glyph != bg_char or front_attrs[index]:
+                front_glyphs[index] = None
+                self.dirty.append(index)
+
+    def compact(self) -> None:
+        """
+        Keep each changed cell once when more changes have built up than
+        there are cells. Use while flushes are being skipped.
+        """
+        if len(self.dirty) > self.width * self.height:
+            self.dirty[:] = set(self.dirty)
+
+    def put(self, y: int, x: int, glyph: str, attr: int = 0) -> None:
+        index = y * self.width + x
+        self.glyphs[index] = glyph
+        self.attrs[index] = attr
+        self.dirty.append(index)
+
+    def checksum(self) -> int:
+        """ CRC32 of every glyph and attribute in the buffer. """
+        crc = zlib.crc32("".join(self.glyphs).encode("utf-8"))
+        return zlib.crc32(array.array("Q", self.attrs).tobytes(), crc)
+
+    def flush(self, screen) -> None:
+        """
+        Send the changed cells to the screen in row-major order. Cells next
+        to each other on a row with the same attribute are sent as one
+        string. A single unchanged cell between two changed cells is sent
+        along with them when it has the same attribute.
+        """
+        glyphs = self.glyphs
+        attrs = self.attrs
+        front_glyphs = self.front_glyphs
+        front_attrs = self.front_attrs
+        width = self.width
+        changed = []
+        for index in set(self.dirty):
+            glyph = glyphs[index]
+            attr = attrs[index]
+            if glyph != front_glyphs[index] or attr != front_attrs[index]:
+                front_glyphs[index] = glyph
+                front_attrs[index] = attr
+                changed.append(index)
+        self.dirty.clear()
+        changed.sort()
+
+        spans = 0
+        span_start = span_end = -2
+        span_attr = None
+        span_text = []
+        for index in changed:
+            attr = attrs[index]
+            gap = index - span_end
+            if (attr == span_attr and index // width == span_start // width
+                    and (gap == 1 or
+                         (gap == 2 and attrs[index - 1] == attr))):
+                if gap == 2:
+                    span_text.append(glyphs[index - 1])
+            else:
+                if span_text:
+                    screen.addstr(*divmod(span_start, width),
+                                  "".join(span_text), span_attr)
+                    spans += 1
+                span_start = index
+                span_attr = attr
+                span_text = []
+            span_text.append(glyphs[index])
+            span_end = index
+        if span_text:
+            screen.addstr(*divmod(span_start, width),
+                          "".join(span_text), span_attr)
+            spans += 1
+        self.cells_written = len(changed)
+        self.spans_written = spans
+        screen.refresh()
+
+
+class Renderer(abc.ABC):
+    """
+    Output backend used by Matrix. The method names follow the curses
+    window so a Renderer can be used anywhere a curses screen was used.
+    Attributes use the curses layout: color_pair(n) + A_BOLD + A_ITALIC.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @abc.abstractmethod
+    def getmaxyx(self) -> Tuple[int, int]:
+        pass
+
+    def is_term_resized(self, nlines: int, ncols: int) -> bool:
+        return (nlines, ncols) != self.getmaxyx()
+
+    @abc.abstractmethod
+    def addstr(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        pass
+
+    def bkgd(self, ch: str, attr: int = 0) -> None:
+        pass
+
+    def clear(self) -> None:
+        self.erase()
+
+    def erase(self) -> None:
+        pass
+
+    def refresh(self) -> None:
+        pass
+
+    def getch(self) -> int:
+        return -1
+
+    def fileno(self) -> Optional[int]:
+        """ File descriptor keys are read from, None when there is none. """
+        return None
+
+    def wait_key(self, wake_fd: Optional[int] = None) -> int:
+        """
+        Sleep until a key is pressed and return it. Returns -1 straight
+        away when there is no input to wait on and KEY_WOKEN when wake_fd
+        becomes readable first.
+        """
+        fd = self.fileno()
+        if fd is None:
+            return -1
+        fds = [fd] if wake_fd is None else [fd, wake_fd]
+        while True:
+            ready, _, _ = select.select(fds, [], [])
+            if wake_fd in ready:
+                os.read(wake_fd, 64)
+                return KEY_WOKEN
+            ch = self.getch()
+            if ch != -1:
+                return ch
+
+    def output_busy(self) -> bool:
+        """ True while the last refresh is still being written out. """
+        return False
+
+    def suspend(self) -> None:
+        """ Hand the terminal back before the process is stopped. """
+
+    def resume(self) -> None:
+        """ Take the terminal back after the process is continued. """
+
+    def color_pair(self, number: int) -> int:
+        return number << 8
+
+    def init_pair(self, number: int, fg: int, bg: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class CursesRenderer(Renderer):
+    def __init__(self, screen):
+        self.screen = screen
+        curses.curs_set(0)  # Set the cursor to off.
+        self.screen.timeout(0)  # Turn blocking off for screen.getch().
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.screen.getmaxyx()
+
+    def is_term_resized(self, nlines: int, ncols: int) -> bool:
+        return curses.is_term_resized(nlines, ncols)
+
+    def addstr(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        self.screen.addstr(y, x, text, attr)
+
+    def bkgd(self, ch: str, attr: int = 0) -> None:
+        self.screen.bkgd(ch, attr)
+
+    def clear(self) -> None:
+        self.screen.clear()
+
+    def erase(self) -> None:
+        self.screen.erase()
+
+    def refresh(self) -> None:
+        self.screen.refresh()
+
+    def getch(self) -> int:
+        return self.screen.getch()
+
+    def fileno(self) -> Optional[int]:
+        return sys.stdin.fileno()
+
+    def suspend(self) -> None:
+        curses.endwin()
+
+    def resume(self) -> None:
+        self.screen.clearok(True)
+        self.screen.refresh()
+
+    def color_pair(self, number: int) -> int:
+        return curses.color_pair(number)
+
+    def init_pair(self, number: int, fg: int, bg: int) -> None:
+        curses.init_pair(number, fg, bg)
+
+
+class NullRenderer(Renderer):
+    """ Headless backend. Drawing is dropped and there is never any input. """
+    def __init__(self, height: int = 24, width: int = 80):
+        self.height = height
+        self.width = width
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    def addstr(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        pass
+
+
+class RecordingRenderer(NullRenderer):
+    """ Headless backend that keeps a copy of the screen and counts writes. """
+    def __init__(self, height: int = 24, width: int = 80):
+        super().__init__(height, width)
+        self.bg_char = " "
+        self.bg_attr = 0
+        self.glyphs = []
+        self.attrs = []
+        self.writes = 0
+        self.frames = 0
+        self.pairs = {}
+        self.erase()
+
+    def addstr(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        row = self.glyphs[y]
+        row_attrs = self.attrs[y]
+        for i, ch in enumerate(text, start=x):
+            row[i] = ch
+            row_attrs[i] = attr
+        self.writes += 1
+
+    def bkgd(self, ch: str, attr: int = 0) -> None:
+        self.bg_char = ch
+        self.bg_attr = attr
+
+    def erase(self) -> None:
+        self.glyphs = [[self.bg_char] * self.width for _ in range(self.height)]
+        self.attrs = [[0] * self.width for _ in range(self.height)]
+
+    def refresh(self) -> None:
+        self.frames += 1
+
+    def init_pair(self, number: int, fg: int, bg: int) -> None:
+        self.pairs[number] = (fg, bg)
+
+    def screenshot(self) -> str:
+        return "\n".join("".join(row) for row in self.glyphs)
+
+
+class OutputWriter:
+    """
+    Writes bytes to a file descriptor on a background thread so a slow
+    terminal does not hold up the next frame. submit adds to the pending
+    bytes and returns straight away while the thread writes the previous
+    batch, so there are two buffers: the one being filled and the one
+    being written.
+    """
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.pending = bytearray()
+        self.writing = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    @property
+    def busy(self) -> bool:
+        return self.writing or bool(self.pending)
+
+    def submit(self, data: bytes) -> None:
+        with self.condition:
+            self.pending += data
+            self.condition.notify()
+
+    def run(self) -> None:
+        condition = self.condition
+        while True:
+            with condition:
+                while not self.pending and not self.closed:
+                    condition.wait()
+                if not self.pending:
+                    return
+                data = bytes(self.pending)
+                self.pending.clear()
+                self.writing = True
+            try:
+                write_all(self.fd, data)
+            finally:
+                with condition:
+                    self.writing = False
+                    condition.notify_all()
+
+    def drain(self) -> None:
+        """ Wait until everything submitted has been written. """
+        with self.condition:
+            while (self.pending or self.writing) and self.thread.is_alive():
+                self.condition.wait(0.1)
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """
+    os.write until all of data is written. The views are released so data
+    can be resized again straight after.
+    """
+    written = os.write(fd, data)
+    if written < len(data):  # partial write
+        with memoryview(data) as view:
+            while written < len(view):
+                with view[written:] as rest:
+                    written += os.write(fd, rest)
+
+
+class AnsiRenderer(Renderer):
+    """
+    Draws with ANSI / VT100 escape sequences straight to the terminal
+    without curses. A frame is built up in one bytearray and handed to the
+    kernel with a single os.write on refresh. Keys are read from stdin and
+    returned with the same codes curses uses so Matrix.handle_input works
+    unchanged.
+    """
+    KEY_SEQUENCES = {b"[A": 259, b"[B": 258, b"[C": 261, b"[D": 260,
+                     b"OA": 259, b"OB": 258, b"OC": 261, b"OD": 260}
+
+    def __init__(self, stdin=None, stdout=None, threaded: bool = False):
+        import termios
+
+        self.in_fd = (stdin or sys.stdin).fileno()
+        self.out_fd = (stdout or sys.stdout).fileno()
+        self.writer = OutputWriter(self.out_fd) if threaded else None
+        self.pairs = {}
+        self.bg_char = " "
+        self.bg_attr = 0
+        self.buffer = bytearray()
+        self.sgr_cache = {}
+        self.cursor = None
+        self.current_attr = None
+        self.saved_tty = termios.tcgetattr(self.in_fd)
+        self.resume()
+
+    def close(self) -> None:
+        self.suspend()
+        if self.writer is not None:
+            self.writer.close()
+
+    def suspend(self) -> None:
+        import termios
+
+        self.buffer += b"\033[0m\033[?7h\033[?25h\033[?1049l"
+        self.refresh()
+        if self.writer is not None:
+            self.writer.drain()
+        termios.tcsetattr(self.in_fd, termios.TCSADRAIN, self.saved_tty)
+
+    def resume(self) -> None:
+        import tty
+
+        tty.setcbreak(self.in_fd)
+        # alternate screen, hide cursor and turn off auto wrap
+        self.buffer += b"\033[?1049h\033[?25l\033[?7l"
+        self.invalidate()
+        if self.pairs:
+            self.erase()
+        self.refresh()
+
+    def fileno(self) -> Optional[int]:
+        return self.in_fd
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        size = os.get_terminal_size(self.out_fd)
+        return size.lines, size.columns
+
+    def sgr(self, attr: int) -> bytes:
+        """ Select graphic rendition escape sequence for a curses attr. """
+        if attr in self.sgr_cache:
+            return self.sgr_cache[attr]
+        pair = (attr >> 8) & 0xff or (self.bg_attr >> 8) & 0xff
+        fg, bg = self.pairs.get(pair, (-1, -1))
+        codes = ["0"]
+        if attr & curses.A_BOLD:
+            codes.append("1")
+        if attr & curses.A_ITALIC:
+            codes.append("3")
+        if 0 <= fg < 8:
+            codes.append(str(30 + fg))
+        elif fg >= 8:
+            codes.append(f"38;5;{fg}")
+        if 0 <= bg < 8:
+            codes.append(str(40 + bg))
+        elif bg >= 8:
+            codes.append(f"48;5;{bg}")
+        sequence = f"\033[{';'.join(codes)}m".encode()
+        self.sgr_cache[attr] = sequence
+        return sequence
+
+    def addstr(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        buffer = self.buffer
+        if self.cursor != (y, x):
+            buffer += b"\033[%d;%dH" % (y + 1, x + 1)
+        if attr != self.current_attr:
+            buffer += self.sgr(attr)
+            self.current_attr = attr
+        encoded, width = encode_glyphs(text)
+        buffer += encoded
+        self.cursor = (y, x + width)
+
+    def bkgd(self, ch: str, attr: int = 0) -> None:
+        self.bg_char = ch
+        self.bg_attr = attr
+        self.invalidate()
+
+    def erase(self) -> None:
+        lines, columns = self.getmaxyx()
+        row = (self.bg_char * columns).encode()
+        self.buffer += self.sgr(0)
+        for y in range(lines):
+            self.buffer += b"\033[%d;1H" % (y + 1) + row
+        self.invalidate()
+
+    def refresh(self) -> None:
+        buffer = self.buffer
+        if self.writer is not None:
+            if buffer:
+                self.writer.submit(buffer)
+            buffer.clear()
+            return
+        if buffer:
+            write_all(self.out_fd, buffer)
+        buffer.clear()
+
+    def output_busy(self) -> bool:
+        return self.writer is not None and self.writer.busy
+
+    def invalidate(self) -> None:
+        """ Forget the cached attributes and cursor position. """
+        self.sgr_cache.clear()
+        self.cursor = None
+        self.current_attr = None
+
+    def read_byte(self, timeout: float = 0) -> int:
+        if not select.select([self.in_fd], [], [], timeout)[0]:
+            return -1
+        data = os.read(self.in_fd, 1)
+        return data[0] if data else -1
+
+    def getch(self) -> int:
+        ch = self.read_byte()
+        if ch != 27:
+            return ch
+        sequence = b""
+        while len(sequence) < 2:
+            next_ch = self.read_byte(0.025)
+            if next_ch == -1:
+                break
+            sequence += bytes([next_ch])
+        return self.KEY_SEQUENCES.get(sequence, 27)
+
+    def init_pair(self, number: int, fg: int, bg: int) -> None:
+        self.pairs[number] = (fg, bg)
+        self.invalidate()
+
+
+class RenderState:
+    """
+    Attribute values for every color pair with and without bold. Rebuilt
+    when a key command changes a setting so drawing a cell is a lookup.
+    """
+    def __init__(self, screen):
+        self.screen = screen
+        self.colors = []
+        self.lead = ()
+        self.bold = 0
+        self.bold_random = False
+        self.random_color = False
+
+    def rebuild(self, args: argparse.Namespace, color_mode: str) -> None:
+        italic = curses.A_ITALIC if args.italic else curses.A_NORMAL
+        self.colors = [self.attr_pair(number, italic) for number in range(8)]
+        self.lead = self.attr_pair(10, italic)
+        self.bold = 1 if args.bold_all else 0
+        self.bold_random = args.bold_on and not args.bold_all
+        self.random_color = color_mode == "random"
+
+    def attr_pair(self, number: int, italic: int) -> Tuple[int, int]:
+        """ Normal and bold attribute for a color pair. """
+        color = self.screen.color_pair(number) + italic
+        return color, color + curses.A_BOLD
+
+
+class RandomSource:
+    """
+    Random glyphs, bold flags and colour numbers handed out one at a time
+    from blocks that are made with a single random.choices call each. The
+    glyph block is thrown away when the character set changes.
+    """
+    BLOCK = 4096
+
+    def __init__(self, char_set: Sequence[str] = ()):
+        self.char_set = char_set
+        self.next_glyph = None
+        self.next_bold = self.stream([True, False, False]).__next__
+        self.next_color = self.stream(range(1, 8)).__next__
+        self.set_char_set(char_set)
+
+    def stream(self, population: Sequence):
+        """ Endless iterator over blocks of random picks. """
+        return itertools.chain.from_iterable(iter(
+            lambda: random.choices(population, k=self.BLOCK), None))
+
+    def set_char_set(self, char_set: Sequence[str]) -> None:
+        self.char_set = char_set
+        self.next_glyph = self.stream(char_set).__next__
+
+
+class StreamEngine:
+    """
+    Keeps every stream of the normal scrolling modes in parallel arrays
+    instead of a SingleLine object each. All streams move the same way so
+    a stream is its fixed column (or row) plus the lead, head and tail
+    positions along the direction of travel. Streams behave exactly like
+    SingleLine and use the random numbers in the same order.
+    """
+    def __init__(self, direction: str, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.cross = array.array("i")  # x going up or down, y going sideways
+        self.lead = array.array("i")
+        self.head = array.array("i")
+        self.tail = array.array("i")
+        self.length = array.array("i")
+        self.async_rate = array.array("i")
+        self.async_count = array.array("i")
+        self.color = array.array("i")
+        self.columns = [self.cross, self.lead, self.head, self.tail,
+                        self.length, self.async_rate, self.async_count,
+                        self.color]
+        self.direction = ""
+        self.vertical = True
+        self.step = 1
+        self.last = 0
+        self.set_direction(direction)
+
+    def __len__(self) -> int:
+        return len(self.cross)
+
+    def set_direction(self, direction: str) -> None:
+        self.direction = direction
+        self.vertical = direction in ["down", "up"]
+        self.step = 1 if direction in ["down", "right"] else -1
+        # last position on screen along the direction of travel
+        self.last = self.height - 2 if self.vertical else self.width - 2
+
+    def clear(self, direction: Optional[str] = None) -> None:
+        for column in self.columns:
+            del column[:]
+        if direction is not None:
+            self.set_direction(direction)
+
+    def add(self, y: int, x: int) -> None:
+        self.async_rate.append(random.randint(0, 4))
+        self.async_count.append(0)
+        self.color.append(random.randint(1, 7))
+        if self.vertical:
+            length = random.randint(3, self.height - 3)
+            self.cross.append(x)
+        else:
+            length = random.randint(3, self.width - 3)
+            self.cross.append(y)
+        self.length.append(length)
+        if self.step == 1:
+            self.lead.append(0)
+            self.head.append(-1)
+            self.tail.append(-length)
+        else:
+            self.lead.append(self.last)
+            self.head.append(self.last + 1)
+            # as in SingleLine, the left tail starts one cell further out
+            if self.vertical:
+                self.tail.append(self.last - 1 + length)
+            else:
+                self.tail.append(self.last + length)
+
+    def in_use(self) -> set:
+        """ Columns that have a stream in them. """
+        return set(self.cross) if self.vertical else set()
+
+    def close(self) -> None:
+        pass
+
+    def draw(self, frame_buffer: FrameBuffer, state: RenderState,
+             source: RandomSource, bg_char: str, clear_tail: bool,
+             async_scroll: bool, free_columns: ColumnPool) -> None:
+        """
+        Move every stream one step, writing straight into frame_buffer,
+        and drop the finished streams. Columns whose tail has started
+        clearing go back to free_columns.
+        """
+        glyphs = frame_buffer.glyphs
+        attrs = frame_buffer.attrs
+        dirty = frame_buffer.dirty
+        width = frame_buffer.width
+        cross, lead, head, tail = self.cross, self.lead, self.head, self.tail
+        async_rate, async_count = self.async_rate, self.async_count
+        columns = self.columns
+        vertical = self.vertical
+        step = self.step
+        last = self.last
+        stride = width if vertical else 1
+        colors = state.colors
+        lead_attr = state.lead
+        bold_random = state.bold_random
+        random_color = state.random_color
+        state_bold = state.bold
+        next_glyph = source.next_glyph
+        next_bold = source.next_bold
+        next_color = source.next_color
+        release = free_columns.release
+        kept = 0
+        for i in range(len(cross)):
+            c = cross[i]
+            if async_scroll and async_count[i] != async_rate[i]:
+                async_count[i] += 1
+            else:
+                if async_scroll:
+                    async_count[i] = 0
+                base = c if vertical else c * width
+                t = tail[i]
+                if 0 <= t <= last:
+                    if clear_tail:
+                        index = base + t * stride
+                        glyphs[index] = bg_char
+                        attrs[index] = 0
+                        dirty.append(index)
+                    if vertical:
+                        release(c)
+                t += step
+                tail[i] = t
+                bold = next_bold() if bold_random else state_bold
+                if random_color:
+                    color = colors[next_color()]
+                else:
+                    color = colors[self.color[i]]
+                h = head[i]
+                if 0 <= h <= last:
+                    index = base + h * stride
+                    glyphs[index] = next_glyph()
+                    attrs[index] = color[bold]
+                    dirty.append(index)
+                head[i] = h + step
+                ld = lead[i]
+                if 0 <= ld <= last:
+                    index = base + ld * stride
+                    glyphs[index] = next_glyph()
+                    attrs[index] = lead_attr[bold]
+                    dirty.append(index)
+                    lead[i] = ld + step
+                if t > last if step == 1 else t < 0:
+                    continue  # finished, not kept
+            if kept != i:
+                for column in columns:
+                    column[kept] = column[i]
+            kept += 1
+        if kept != len(cross):
+            for column in columns:
+                del column[kept:]
+
+
+class NumpyEngine:
+    """
+    Stream engine for very large screens. The stream state is kept in
+    NumPy arrays and all streams are moved with a few vectorised
+    operations per frame. The glyphs for every cell written in a frame
+    come from a single Generator.integers call. Needs NumPy.
+    """
+    FIELDS = ["cross", "lead", "head", "tail", "async_rate", "async_count",
+              "color"]
+
+    def __init__(self, direction: str, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rng = numpy.random.default_rng(random.getrandbits(64))
+        self.pending = []  # streams added since the last draw
+        self.char_set = None
+        self.char_array = None
+        self.direction = ""
+        self.vertical = True
+        self.step = 1
+        self.last = 0
+        self.clear(direction)
+
+    def __len__(self) -> int:
+        return len(self.cross) + len(self.pending)
+
+    def set_direction(self, direction: str) -> None:
+        self.direction = direction
+        self.vertical = direction in ["down", "up"]
+        self.step = 1 if direction in ["down", "right"] else -1
+        self.last = self.height - 2 if self.vertical else self.width - 2
+
+    def clear(self, direction: Optional[str] = None) -> None:
+        for field in self.FIELDS:
+            setattr(self, field, numpy.zeros(0, dtype=numpy.int64))
+        self.pending.clear()
+        if direction is not None:
+            self.set_direction(direction)
+
+    def add(self, y: int, x: int) -> None:
+        async_rate = random.randint(0, 4)
+        color = random.randint(1, 7)
+        if self.vertical:
+            length = random.randint(3, self.height - 3)
+            cross = x
+        else:
+            length = random.randint(3, self.width - 3)
+            cross = y
+        if self.step == 1:
+            lead, head, tail = 0, -1, -length
+        elif self.vertical:
+            lead, head, tail = self.last, self.last + 1, self.last - 1 + length
+        else:
+            lead, head, tail = self.last, self.last + 1, self.last + length
+        self.pending.append((cross, lead, head, tail, async_rate, 0, color))
+
+    def in_use(self) -> set:
+        """ Columns that have a stream in them. """
+        if not self.vertical:
+            return set()
+        return set(self.cross.tolist()) | {line[0] for line in self.pending}
+
+    def close(self) -> None:
+        pass
+
+    def merge_pending(self) -> None:
+        if not self.pending:
+            return
+        added = numpy.array(self.pending, dtype=numpy.int64)
+        for number, field in enumerate(self.FIELDS):
+            setattr(self, field, numpy.concatenate(
+                (getattr(self, field), added[:, number])))
+        self.pending.clear()
+
+    def glyph_array(self, char_set: Sequence[str]):
+        if char_set is not self.char_set:
+            self.char_set = char_set
+            self.char_array = numpy.array(char_set, dtype=object)
+        return self.char_array
+
+    def draw(self, frame_buffer: FrameBuffer, state: RenderState,
+             source: RandomSource, bg_char: str, clear_tail: bool,
+             async_scroll: bool, free_columns: ColumnPool) -> None:
+        """
+        Same as StreamEngine.draw for all streams at once. Only the
+        character set is taken from source, the random numbers come from
+        the engine's own NumPy generator.
+        """
+        self.merge_pending()
+        count = len(self.cross)
+        if count == 0:
+            return
+        last = self.last
+        step = self.step
+        width = frame_buffer.width
+        if self.vertical:
+            base = self.cross
+            stride = width
+        else:
+            base = self.cross * width
+            stride = 1
+        if async_scroll:
+            active = self.async_count == self.async_rate
+            self.async_count = numpy.where(active, 0, self.async_count + 1)
+        else:
+            active = numpy.ones(count, dtype=bool)
+        moves = active * step
+
+        tail = self.tail
+        clearing = active & (tail >= 0) & (tail <= last)
+        if self.vertical:
+            for x in self.cross[clearing].tolist():
+                free_columns.release(x)
+        self.tail = tail + moves
+
+        if state.bold_random:
+            bold = (self.rng.random(count) < 1 / 3).astype(numpy.intp)
+        else:
+            bold = numpy.full(count, state.bold, dtype=numpy.intp)
+        if state.random_color:
+            color = self.rng.integers(1, 8, count)
+        else:
+            color = self.color
+        head = self.head
+        heads = active & (head >= 0) & (head <= last)
+        self.head = head + moves
+        lead = self.lead
+        leads = active & (lead >= 0) & (lead <= last)
+        self.lead = lead + leads * step
+
+        color_table = numpy.array(state.colors, dtype=numpy.int64)
+        lead_table = numpy.array(state.lead, dtype=numpy.int64)
+        indices = numpy.concatenate(((base + head * stride)[heads],
+                                     (base + lead * stride)[leads]))
+        cell_attrs = numpy.concatenate((color_table[color[heads], bold[heads]],
+                                        lead_table[bold[leads]]))
+        char_set = source.char_set
+        glyph_numbers = self.rng.integers(0, len(char_set), len(indices))
+        cell_glyphs = self.glyph_array(char_set)[glyph_numbers].tolist()
+
+        glyphs = frame_buffer.glyphs
+        attrs = frame_buffer.attrs
+        dirty = frame_buffer.dirty
+        if clear_tail:
+            cleared = (base + tail * stride)[clearing].tolist()
+            for index in cleared:
+                glyphs[index] = bg_char
+                attrs[index] = 0
+            dirty.extend(cleared)
+        indices = indices.tolist()
+        for index, glyph, attr in zip(indices, cell_glyphs,
+                                      cell_attrs.tolist()):
+            glyphs[index] = glyph
+            attrs[index] = attr
+        dirty.extend(indices)
+
+        if step == 1:
+            finished = active & (self.tail > last)
+        else:
+            finished = active & (self.tail < 0)
+        if finished.any():
+            keep = ~finished
+            for field in self.FIELDS:
+                setattr(self, field, getattr(self, field)[keep])
+
+
+class ShardView:
+    """ The parts of a FrameBuffer StreamEngine.draw writes, over grids. """
+    def __init__(self, glyphs: memoryview, attrs: memoryview, width: int):
+        self.glyphs = glyphs
+        self.attrs = attrs
+        self.width = width
+        self.dirty = array.array("i")
+
+
+class ReleasedColumns:
+    """ Collects the columns a shard gives back during a draw. """
+    def __init__(self):
+        self.columns = set()
+
+    def release(self, column: int) -> None:
+        self.columns.add(column)
+
+
+def shard_worker(connection, glyph_name: str, attr_name: str,
+                 direction: str, width: int, height: int, seed: int) -> None:
+    """
+    Worker process of ShardedEngine. Steps the streams of one shard with a
+    StreamEngine, writing code points and attributes into the shared grids,
+    and answers each draw with the changed cells, the columns given back
+    and the number of streams left.
+    """
+    # the terminal belongs to the main process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTSTP, signal.SIG_DFL)
+    signal.signal(signal.SIGCONT, signal.SIG_DFL)
+    random.seed(seed)
+    glyph_memory = shared_memory.SharedMemory(name=glyph_name)
+    attr_memory = shared_memory.SharedMemory(name=attr_name)
+    view = ShardView(glyph_memory.buf.cast("I"), attr_memory.buf.cast("Q"),
+                     width)
+    engine = StreamEngine(direction, width, height)
+    source = RandomSource()
+    state = RenderState(None)
+    try:
+        while True:
+            command, *arguments = connection.recv()
+            if command == "draw":
+                adds, codes, settings = arguments
+                if codes is not None:
+                    source.set_char_set(codes)
+                (state.colors, state.lead, state.bold, state.bold_random,
+                 state.random_color, bg_code, clear_tail,
+                 async_scroll) = settings
+                for y, x in adds:
+                    engine.add(y, x)
+                released = ReleasedColumns()
+                view.dirty = array.array("i")
+                engine.draw(view, state, source, bg_code, clear_tail,
+                            async_scroll, released)
+                connection.send((view.dirty.tobytes(), released.columns,
+                                 len(engine)))
+            elif command == "clear":
+                engine.clear(arguments[0])
+            elif command == "direction":
+                engine.set_direction(arguments[0])
+            elif command == "in_use":
+                connection.send(engine.in_use())
+            else:
+                break
+    except EOFError:
+        pass  # main process has gone
+    finally:
+        view.glyphs.release()
+        view.attrs.release()
+        glyph_memory.close()
+        attr_memory.close()
+
+
+class ShardedEngine:
+    """
+    Splits the streams of the arrays engine between worker processes by
+    column (by row going sideways) so more than one core moves the rain.
+    Each worker writes glyph code points and attributes into grids in
+    shared memory. The main process reads the changed cells out of the
+    grids in bulk and copies them into the frame buffer, which diffs and
+    flushes them as usual.
+
+    Each worker has its own random numbers, so a seeded run draws the
+    same rain every time for the same number of workers but not the same
+    rain as the arrays engine on its own.
+    """
+    def __init__(self, direction: str, width: int, height: int,
+                 workers: int):
+        self.width = width
+        self.height = height
+        cells = max(width * height, 1)
+        self.glyph_memory = shared_memory.SharedMemory(create=True,
+                                                       size=cells * 4)
+        self.attr_memory = shared_memory.SharedMemory(create=True,
+                                                      size=cells * 8)
+        self.glyph_grid = self.glyph_memory.buf.cast("I")
+        self.attr_grid = self.attr_memory.buf.cast("Q")
+        self.glyph_array = self.attr_array = None
+        if numpy is not None:
+            self.glyph_array = numpy.frombuffer(self.glyph_memory.buf,
+                                                dtype=numpy.uint32)
+            self.attr_array = numpy.frombuffer(self.attr_memory.buf,
+                                               dtype=numpy.uint64)
+        self.connections = []
+        self.processes = []
+        for _ in range(workers):
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=shard_worker, daemon=True,
+                args=(child_connection, self.glyph_memory.name,
+                      self.attr_memory.name, direction, width, height,
+                      random.getrandbits(64)))
+            process.start()
+            child_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+        self.adds = [[] for _ in range(workers)]
+        self.counts = [0] * workers
+        self.char_set = None
+        self.direction = direction
+        self.vertical = direction in ["down", "up"]
+
+    def __len__(self) -> int:
+        return sum(self.counts) + sum(len(adds) for adds in self.adds)
+
+    def set_direction(self, direction: str) -> None:
+        self.direction = direction
+        self.vertical = direction in ["down", "up"]
+        for connection in self.connections:
+            connection.send(("direction", direction))
+
+    def clear(self, direction: Optional[str] = None) -> None:
+        for adds in self.adds:
+            adds.clear()
+        self.counts = [0] * len(self.counts)
+        if direction is not None:
+            self.direction = direction
+            self.vertical = direction in ["down", "up"]
+        for connection in self.connections:
+            connection.send(("clear", direction))
+
+    def add(self, y: int, x: int) -> None:
+        cross = x if self.vertical else y
+        self.adds[cross % len(self.adds)].append((y, x))
+
+    def in_use(self) -> set:
+        """ Columns that have a stream in them. """
+        if not self.vertical:
+            return set()
+        in_use = {x for adds in self.adds for _, x in adds}
+        for connection in self.connections:
+            connection.send(("in_use",))
+        for connection in self.connections:
+            in_use |= connection.recv()
+        return in_use
+
+    def draw(self, frame_buffer: FrameBuffer, state: RenderState,
+             source: RandomSource, bg_char: str, clear_tail: bool,
+             async_scroll: bool, free_columns: ColumnPool) -> None:
+        """
+        Have every worker move its streams, then copy the cells they
+        changed into frame_buffer and give back the columns they freed.
+        """
+        codes = None
+        if source.char_set is not self.char_set:
+            self.char_set = source.char_set
+            codes = tuple(map(ord, source.char_set))
+        settings = (state.colors, state.lead, state.bold, state.bold_random,
+                    state.random_color, ord(bg_char), clear_tail,
+                    async_scroll)
+        for connection, adds in zip(self.connections, self.adds):
+            connection.send(("draw", adds, codes, settings))
+        self.adds = [[] for _ in self.connections]
+
+        indices = array.array("i")
+        release = free_columns.release
+        for shard, connection in enumerate(self.connections):
+            changed, released, count = connection.recv()
+            indices.frombytes(changed)
+            for column in released:
+                release(column)
+            self.counts[shard] = count
+
+        glyphs = frame_buffer.glyphs
+        attrs = frame_buffer.attrs
+        cell_glyphs, cell_attrs = self.read_cells(indices)
+        for index, glyph, attr in zip(indices, cell_glyphs, cell_attrs):
+            glyphs[index] = glyph
+            attrs[index] = attr
+        frame_buffer.dirty.extend(indices)
+
+    def read_cells(self, indices: array.array) -> Tuple[str, Sequence[int]]:
+        """
+        Glyphs and attributes of the given cells of the shared grids. The
+        code points are decoded in one go, and with NumPy both grids are
+        also indexed in one go instead of cell by cell.
+        """
+        if self.glyph_array is not None:
+            where = numpy.frombuffer(indices, dtype=numpy.intc)
+            codes = self.glyph_array[where].tobytes()
+            return (codes.decode(GRID_ENCODING),
+                    self.attr_array[where].tolist())
+        codes = array.array("I", map(self.glyph_grid.__getitem__, indices))
+        return (codes.tobytes().decode(GRID_ENCODING),
+                list(map(self.attr_grid.__getitem__, indices)))
+
+    def close(self) -> None:
+        """ Stop the workers and free the shared memory. """
+        for connection in self.connections:
+            try:
+                connection.send(("stop",))
+            except OSError:
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.connections = []
+        self.processes = []
+        self.glyph_array = self.attr_array = None
+        self.glyph_grid.release()
+        self.attr_grid.release()
+        self.glyph_memory.close()
+        self.glyph_memory.unlink()
+        self.attr_memory.close()
+        self.attr_memory.unlink()
+
+
+class FramePacer:
+    """
+    Keeps a steady frame rate by sleeping until the next frame deadline on
+    the monotonic clock, so the time spent drawing is part of the frame
+    period. A late frame does not sleep so the following frames catch up.
+    When more than MAX_LAG frames behind the missed frames are dropped and
+    the deadline starts again from now.
+    """
+    MAX_LAG = 3
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.dropped = 0
+
+    def wait(self, period: float) -> None:
+        delay = self.next_deadline(period) - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def next_deadline(self, period: float) -> float:
+        """ Move the deadline on one frame and return it. """
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += period
+        lag = now - self.deadline
+        if lag > period * self.MAX_LAG:
+            self.dropped += int(lag / period)
+            self.deadline = now
+        return self.deadline
+
+
+class QualityGovernor:
+    """
+    Backs the rain off when frames run over their time budget and puts it
+    back when there is headroom again. Each level adds one step:
+    1 spawns one stream per frame instead of two, 2 caps the number of
+    streams at half the screen and 3 switches to double spaced columns.
+    """
+    MAX_LEVEL = 3
+    BACK_OFF_FRAMES = 5
+    RESTORE_FRAMES = 60
+    HEADROOM = 0.5
+
+    def __init__(self):
+        self.level = 0
+        self.over_budget = 0
+        self.under_budget = 0
+        self.frame = 0
+        self.decisions = []
+
+    def update(self, work_time: float, budget: float) -> bool:
+        """ Returns True when the level changed. """
+        self.frame += 1
+        if work_time > budget:
+            self.over_budget += 1
+            self.under_budget = 0
+        elif work_time < budget * self.HEADROOM:
+            self.under_budget += 1
+            self.over_budget = 0
+        else:
+            self.over_budget = 0
+            self.under_budget = 0
+        if (self.over_budget >= self.BACK_OFF_FRAMES and
+                self.level < self.MAX_LEVEL):
+            self.set_level(self.level + 1)
+            return True
+        elif self.under_budget >= self.RESTORE_FRAMES and self.level > 0:
+            self.set_level(self.level - 1)
+            return True
+        return False
+
+    def set_level(self, level: int) -> None:
+        self.decisions.append((self.frame, self.level, level))
+        self.level = level
+        self.over_budget = 0
+        self.under_budget = 0
+
+    @property
+    def spawn_count(self) -> int:
+        return 1 if self.level >= 1 else 2
+
+    @property
+    def line_fraction(self) -> float:
+        return 0.5 if self.level >= 2 else 1.0
+
+    @property
+    def double_space(self) -> bool:
+        return self.level >= 3
+
+    def report(self) -> str:
+        lines = [f"quality level: {self.level}",
+                 f"quality changes: {len(self.decisions)}"]
+        for frame, old, new in self.decisions:
+            lines.append(f"  frame {frame}: level {old} -> {new}")
+        return "\n".join(lines)
+
+
+class FrameStats:
+    """ Frame times and cell counts collected in benchmark mode. """
+    def __init__(self):
+        self.frame_times = []
+        self.cells = 0
+        self.spans = 0
+        self.key_latencies = []
+        self.frames_not_sent = 0
+
+    def record(self, frame_time: float, cells: int, spans: int) -> None:
+        self.frame_times.append(frame_time)
+        self.cells += cells
+        self.spans += spans
+
+    def percentile(self, percent: float,
+                   values: Optional[List[float]] = None) -> float:
+        """ Nearest rank percentile of the frame times or given values. """
+        if values is None:
+            values = self.frame_times
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    def report(self) -> str:
+        frames = len(self.frame_times)
+        total = sum(self.frame_times)
+        fps = frames / total if total else 0.0
+        per_frame = max(frames, 1)
+        return "\n".join([
+            f"frames: {frames}",
+            f"frames per second: {fps:.1f}",
+            f"cells written per frame: {self.cells / per_frame:.1f}",
+            f"writes per frame: {self.spans / per_frame:.1f}",
+            f"frame time p50: {self.percentile(50) * 1000:.3f} ms",
+            f"frame time p95: {self.percentile(95) * 1000:.3f} ms",
+            f"frame time p99: {self.percentile(99) * 1000:.3f} ms",
+        ])
+
+    def latency_report(self) -> str:
+        """ Time from a key press to the frame showing it. """
+        latencies = self.key_latencies
+        return "\n".join([
+            f"key presses shown: {len(latencies)}",
+            f"key to screen p50: "
+            f"{self.percentile(50, latencies) * 1000:.3f} ms",
+            f"key to screen p95: "
+            f"{self.percentile(95, latencies) * 1000:.3f} ms",
+        ])
+
+
+class PhaseTimer:
+    """ Adds up the time spent in each phase of the main loop. """
+    PHASES = ["resize", "add_lines", "color_cycle", "display", "refresh",
+              "wake_up", "pacing", "input"]
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self.counts = dict.fromkeys(self.PHASES, 0)
+        self.mark = 0.0
+
+    def start(self) -> None:
+        self.mark = self.clock()
+
+    def lap(self, phase: str) -> None:
+        """ Charge the time since the last mark to phase. """
+        now = self.clock()
+        self.totals[phase] += now - self.mark
+        self.counts[phase] += 1
+        self.mark = now
+
+    def report(self) -> str:
+        total = sum(self.totals.values())
+        lines = [f"{'phase':<12}{'total ms':>12}{'calls':>8}"
+                 f"{'mean us':>10}{'share':>8}"]
+        for phase in self.PHASES:
+            calls = self.counts[phase]
+            mean = self.totals[phase] / calls if calls else 0.0
+            share = self.totals[phase] / total if total else 0.0
+            lines.append(f"{phase:<12}{self.totals[phase] * 1000:>12.3f}"
+                         f"{calls:>8}{mean * 1000000:>10.1f}{share:>8.1%}")
+        return "\n".join(lines)
+
+
+KeyPress = collections.namedtuple("KeyPress", ["key", "time"])
+
+
+class KeyReader:
+    """
+    Reads keys on a background thread, waiting on the input file descriptor
+    with a selector. Bytes are decoded into the key codes curses uses and
+    queued as KeyPress(key, time) so the main loop takes keys without any
+    terminal calls. The queue is a deque, whose append and popleft are
+    atomic, so the two threads share it without a lock.
+    """
+    ESCAPE_TIMEOUT = 0.025
+
+    def __init__(self, fd: int,
+                 clock: Callable[[], float] = time.perf_counter,
+                 wake_fd: Optional[int] = None):
+        self.fd = fd
+        self.clock = clock
+        self.wake_fd = wake_fd
+        self.woken = False
+        self.presses = collections.deque()
+        self.escape = bytearray()  # escape sequence read so far
+        self.stop_read, self.stop_write = os.pipe()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.fd, selectors.EVENT_READ)
+        self.selector.register(self.stop_read, selectors.EVENT_READ)
+        if wake_fd is not None:
+            self.selector.register(wake_fd, selectors.EVENT_READ)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.stopped = False
+        self.ready = threading.Event()
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.stopped:
+            return
+        self.stopped = True
+        if self.thread.is_alive():
+            os.write(self.stop_write, b"x")
+            self.thread.join()
+        self.selector.close()
+        os.close(self.stop_read)
+        os.close(self.stop_write)
+
+    def run(self) -> None:
+        while True:
+            timeout = self.ESCAPE_TIMEOUT if self.escape else None
+            events = self.selector.select(timeout)
+            if not events:
+                self.push(27, self.clock())  # a lone escape key
+                self.ready.set()
+                continue
+            ready = {key.fd for key, _ in events}
+            if self.stop_read in ready:
+                return
+            if self.wake_fd in ready:
+                os.read(self.wake_fd, 64)
+                self.woken = True
+                self.ready.set()
+                if self.fd not in ready:
+                    continue
+            data = os.read(self.fd, 1024)
+            if not data:
+                self.ready.set()
+                return
+            self.feed(data, self.clock())
+            self.ready.set()
+
+    def feed(self, data: bytes, stamp: float) -> None:
+        """ Decode bytes read from the terminal into key presses. """
+        for byte in data:
+            if self.escape:
+                self.escape.append(byte)
+                if len(self.escape) == 3:
+                    sequence = bytes(self.escape[1:])
+                    self.escape.clear()
+                    self.presses.append(KeyPress(
+                        AnsiRenderer.KEY_SEQUENCES.get(sequence, 27), stamp))
+            elif byte == 27:
+                self.escape.append(byte)
+            else:
+                self.presses.append(KeyPress(byte, stamp))
+
+    def push(self, key: int, stamp: float) -> None:
+        self.escape.clear()
+        self.presses.append(KeyPress(key, stamp))
+
+    def get_presses(self) -> List[KeyPress]:
+        """ Take every queued key press, oldest first. """
+        presses = []
+        while len(presses) < MAX_KEYS_PER_FRAME:
+            try:
+                presses.append(self.presses.popleft())
+            except IndexError:
+                break
+        return presses
+
+    def getch(self) -> int:
+        try:
+            return self.presses.popleft().key
+        except IndexError:
+            return -1
+
+    def wait_key(self) -> int:
+        """
+        Sleep until the thread queues a key and return it, or KEY_WOKEN
+        when the thread saw the wake file descriptor first.
+        """
+        while True:
+            self.ready.clear()
+            ch = self.getch()
+            if ch != -1 or not self.thread.is_alive():
+                return ch
+            if self.woken:
+                self.woken = False
+                return KEY_WOKEN
+            self.ready.wait()
+
+
+class AsyncDriver:
+    """
+    Runs the Matrix on an asyncio event loop instead of sleeping between
+    frames. Frames are scheduled with loop.call_at on the frame period and
+    keys are handled as soon as the input is readable, so other sources
+    can share the same loop.
+    """
+    def __init__(self, matrix: "Matrix"):
+        self.matrix = matrix
+        self.loop = None
+        self.done = None
+        self.input_fd = None
+
+    def run(self) -> None:
+        asyncio.run(self.main())
+
+    async def main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.done = self.loop.create_future()
+        if self.matrix.key_reader is None:
+            self.input_fd = self.matrix.screen.fileno()
+        if self.input_fd is not None:
+            self.loop.add_reader(self.input_fd, self.on_input)
+        self.loop.call_soon(self.on_frame)
+        try:
+            await self.done
+        finally:
+            if self.input_fd is not None:
+                self.loop.remove_reader(self.input_fd)
+
+    def stop(self, error: Optional[Exception] = None) -> None:
+        if self.done.done():
+            return
+        if error is None:
+            self.done.set_result(None)
+        else:
+            self.done.set_exception(error)
+
+    def on_input(self) -> None:
+        if self.done.done():
+            return
+        try:
+            if self.matrix.handle_input():
+                self.stop()
+        except Exception as error:
+            self.stop(error)
+
+    def on_frame(self) -> None:
+        if self.done.done():
+            return
+        matrix = self.matrix
+        try:
+            matrix.resume_screen()
+            frame_start = time.perf_counter()
+            if matrix.handle_resize():
+                self.loop.call_soon(self.on_frame)
+                return
+            if not matrix.draw_frame(frame_start):
+                self.stop()
+                return
+            # without a file descriptor to watch keys are polled each frame
+            if self.input_fd is None and matrix.handle_input():
+                self.stop()
+                return
+            if not matrix.end_frame(frame_start):
+                self.stop()
+                return
+        except Exception as error:
+            self.stop(error)
+            return
+        if matrix.args.benchmark:
+            self.loop.call_soon(self.on_frame)
+            return
+        # the pacer and the default event loop both use time.monotonic
+        deadline = matrix.pacer.next_deadline(matrix.frame_period())
+        self.loop.call_at(deadline, self.on_frame)
+
+
+class WakeUpSequence:
+    """
+    The wake up Neo messages as a timeline of steps, each with the time it
+    is due after the start. The main loop calls advance once a frame, which
+    draws the steps that are due, so keys are still handled and the rain
+    carries on from where it was once the sequence is over or skipped.
+    """
+    # text, seconds per letter, seconds the text stays up
+    MESSAGES = [("Wake up, Neo...", 0.08, 7.0),
+                ("The Matrix has you...", 0.25, 7.0),
+                ("Follow the white rabbit.", 0.1, 7.0),
+                ("Knock, knock, Neo.", 0.01, 3.0)]
+
+    def __init__(self, test_mode: bool = False,
+                 clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.steps = self.build_steps(0.06 if test_mode else 1)
+        self.position = 0
+        self.start_time = clock()
+
+    @classmethod
+    def build_steps(cls, z: float) -> List[Tuple[float, str, tuple]]:
+        """ z scales the times, test mode uses shorter ones. """
+        steps = [(0.0, "begin", ())]
+        due = 3 * z
+        for text, type_time, hold_time in cls.MESSAGES:
+            for x, letter in enumerate(text, start=1):
+                steps.append((due, "letter", (x, letter)))
+                due += type_time * z
+            due += hold_time * z
+            steps.append((due, "erase", ()))
+        steps.append((due + 2 * z, "end", ()))
+        return steps
+
+    @property
+    def done(self) -> bool:
+        return self.position >= len(self.steps)
+
+    def advance(self, screen) -> bool:
+        """ Draw the steps that are due. Returns False once it is over. """
+        elapsed = self.clock() - self.start_time
+        steps = self.steps
+        drawn = False
+        while not self.done and steps[self.position][0] <= elapsed:
+            _, action, arguments = steps[self.position]
+            self.position += 1
+            if action == "begin":
+                screen.erase()
+                screen.bkgd(" ", screen.color_pair(WAKE_UP_PAIR))
+            elif action == "letter":
+                x, letter = arguments
+                screen.addstr(1, x, letter,
+                              screen.color_pair(WAKE_UP_PAIR) + curses.A_BOLD)
+            elif action == "erase":
+                screen.erase()
+            drawn = True
+        if drawn:
+            screen.refresh()
+        return not self.done
+
+
+def coalesce_keys(keys: Sequence[int]) -> List[int]:
+    """
+    Drop keys that the next key overrides. In a run of delay keys, arrows
+    or cycle delay keys only the last is kept, and repeats of a key that
+    sets something (colors, bold, defaults) are dropped.
+    """
+    coalesced = []
+    for ch in keys:
+        if coalesced:
+            last = coalesced[-1]
+            if ch == last and ch in REPEAT_KEYS:
+                continue
+            if any(last in group and ch in group for group in LAST_KEY_WINS):
+                coalesced[-1] = ch
+                continue
+        coalesced.append(ch)
+    return coalesced
 
 
 class Matrix:
     def __init__(self, screen, args: argparse.Namespace):
         self.screen = screen
         self.args = args
-        curses.curs_set(0)  # Set the cursor to off.
-        self.screen.timeout(0)  # Turn blocking off for screen.getch().
+        if self.args.seed is not None:
+            random.seed(self.args.seed)
         self.setup_colors()
-        self.screen.bkgd(self.args.bg_char, curses.color_pair(1))
+        self.screen.bkgd(self.args.bg_char, self.screen.color_pair(1))
         self.color_cycle = itertools.cycle([1, 2, 3, 4, 5, 6])
         self.color_cycle_count = itertools.count(start=0, step=1)
         self.color_cycle_delay = DEFAULT_CYCLE_COLOR_DELAY
         self.wake_up_time = 20 if self.args.test_mode \
             else random.randint(2000, 3000)
+        self.wake_up = None
+        self.random_source = RandomSource()
         self.char_set = build_character_set2(args)
         if args.reverse:
             self.dir = "up"
@@ -310,91 +2053,400 @@ class Matrix:
             self.dir = "down"
         if self.args.multiple_mode:
             self.color_mode = "multiple"
-            setup_curses_colors("random",
-                                self.args.background, self.args.over_ride)
+            setup_curses_colors("random", self.args.background,
+                                self.args.over_ride, self.screen.init_pair)
         elif self.args.random_mode:
             self.color_mode = "random"
-            setup_curses_colors("random",
-                                self.args.background, self.args.over_ride)
+            setup_curses_colors("random", self.args.background,
+                                self.args.over_ride, self.screen.init_pair)
         elif self.args.cycle:
             self.color_mode = "cycle"
         else:
             self.color_mode = "normal"
         self.spacer = 2 if self.args.double_space else 1
         self.line_list = []
-        self.x_list = []
+        self.line_pool = LinePool()
+        self.streams = None
+        self.free_columns = ColumnPool()
         self.y_list = []
         self.keys_pressed = []
+        self.frame_buffer = None
+        self.render_state = RenderState(self.screen)
+        self.render_state.rebuild(self.args, self.color_mode)
+        self.stats = FrameStats()
+        self.checksums = []
+        self.key_queue = collections.deque()
+        self.key_reader = None
+        self.key_time = None  # oldest key press not yet on the screen
+        self.suspended = False
+        self.resumed = False  # set by the SIGCONT handler
+        self.wake_read = self.wake_write = None
+        self.saved_handlers = {}
+        self.pacer = FramePacer()
+        self.phases = PhaseTimer()
+        self.governor = QualityGovernor() if self.args.adaptive else None
+        self.governor_spacing = False
+        self.size_y = 0
+        self.size_x = 0
         self.main_loop()
 
     def main_loop(self) -> None:
+        self.setup_screen()
+        self.install_signal_handlers()
+        input_fd = self.screen.fileno()
+        if self.args.key_thread and input_fd is not None:
+            self.key_reader = KeyReader(input_fd, wake_fd=self.wake_read)
+            self.key_reader.start()
+        try:
+            if self.args.asyncio:
+                AsyncDriver(self).run()
+            else:
+                while self.tick():
+                    pass
+        finally:
+            if self.key_reader is not None:
+                self.key_reader.stop()
+            self.restore_signal_handlers()
+            if self.streams is not None:
+                self.streams.close()
+        self.screen.erase()
+        self.screen.refresh()
+
+    def setup_screen(self) -> None:
         size_y, size_x = self.screen.getmaxyx()
         self.check_screen_size(size_y, size_x)
-        self.x_list = [x for x in range(0, size_x, self.spacer)]
+        self.size_y, self.size_x = size_y, size_x
+        self.frame_buffer = FrameBuffer(size_y, size_x, self.args.bg_char)
+        self.streams = self.build_streams(size_y, size_x)
+        self.free_columns.reset(range(0, size_x, self.spacer))
         self.y_list = [y for y in range(1, size_y)]
+        self.end_time = time.monotonic() + self.args.run_timer
 
-        time_delta = datetime.timedelta(seconds=self.args.run_timer)
-        end_time = datetime.datetime.now() + time_delta
-        while True:
-            if curses.is_term_resized(size_y, size_x):
-                size_y, size_x = self.screen.getmaxyx()
-                self.check_screen_size(size_y, size_x)
-                self.x_list = [x for x in range(0, size_x, self.spacer)]
-                self.y_list = [y for y in range(0, size_y)]
-                self.line_list.clear()
-                self.screen.clear()
-                self.screen.refresh()
-                continue
-            self.add_lines(size_y, size_x)
-            if self.color_mode == "cycle":
-                if next(self.color_cycle_count) == self.color_cycle_delay:
-                    color = list(CURSES_COLOR.keys())[next(self.color_cycle)]
-                    setup_curses_colors(color,
-                                        self.args.background,
-                                        self.args.over_ride)
-                    self.color_cycle_count = itertools.count(start=0, step=1)
-            if self.dir == "old scrolling":
-                self.display_old_scrolling()
-            else:
-                self.display_normal_scrolling()
-            if self.args.wakeup:
-                self.handle_wake_up()
-            if self.args.run_timer and datetime.datetime.now() >= end_time:
-                break
-            time.sleep(DELAY_SPEED[self.args.delay])
-            if self.handle_input():
-                break
-        self.screen.erase()
-        self.screen.refresh()
+    def install_signal_handlers(self) -> None:
+        """
+        Give the terminal back on ctrl-z and stay stopped while in the
+        background, so a suspended Matrix uses no CPU. Only done for a real
+        terminal from the main thread. The wake pipe lets the SIGCONT
+        handler end a wait for a key.
+        """
+        fd = self.screen.fileno()
+        if (fd is None or not os.isatty(fd) or
+                threading.current_thread() is not threading.main_thread()):
+            return
+        self.wake_read, self.wake_write = os.pipe()
+        os.set_blocking(self.wake_read, False)
+        os.set_blocking(self.wake_write, False)
+        for signum, handler in [(signal.SIGTSTP, self.handle_suspend),
+                                (signal.SIGCONT, self.handle_continue)]:
+            self.saved_handlers[signum] = signal.signal(signum, handler)
+
+    def restore_signal_handlers(self) -> None:
+        for signum, handler in self.saved_handlers.items():
+            signal.signal(signum, handler)
+        self.saved_handlers = {}
+        if self.wake_read is not None:
+            os.close(self.wake_read)
+            os.close(self.wake_write)
+            self.wake_read = self.wake_write = None
+
+    def in_foreground(self) -> bool:
+        try:
+            return os.tcgetpgrp(self.screen.fileno()) == os.getpgrp()
+        except OSError:
+            return True
 
+    def handle_suspend(self, signum, frame) -> None:
+        if not self.suspended:
+            self.suspended = True
+            self.screen.suspend()
+        # stop with the default action, on this thread so it happens now
+        signal.signal(signal.SIGTSTP, signal.SIG_DFL)
+        signal.pthread_kill(threading.get_ident(), signal.SIGTSTP)
+        signal.signal(signal.SIGTSTP, self.handle_suspend)
+
+    def handle_continue(self, signum, frame) -> None:
+        """
+        Only flags the resume. The handler can run part way through a
+        frame, so the terminal is taken back by resume_screen between
+        frames.
+        """
+        if not self.in_foreground():
+            # drawing in the background only burns CPU, wait for fg
+            os.kill(os.getpid(), signal.SIGSTOP)
+            return
+        if self.suspended:
+            self.resumed = True
+            if self.wake_write is not None:
+                try:
+                    os.write(self.wake_write, b"x")
+                except BlockingIOError:
+                    pass  # a wake up is already waiting
+
+    def resume_screen(self) -> bool:
+        """ Take the terminal back and redraw it after a SIGCONT. """
+        if not self.resumed:
+            return False
+        self.resumed = False
+        self.suspended = False
+        self.screen.resume()
+        if self.frame_buffer is not None:
+            self.frame_buffer.invalidate(self.args.bg_char)
+            self.frame_buffer.flush(self.screen)
+        return True
+
+    def handle_resize(self) -> bool:
+        """ Rebuild the screen when the terminal was resized. """
+        self.phases.start()
+        resized = self.screen.is_term_resized(self.size_y, self.size_x)
+        if resized:
+            self.resize()
+        self.phases.lap("resize")
+        return resized
+
+    def resize(self) -> None:
+        size_y, size_x = self.screen.getmaxyx()
+        self.check_screen_size(size_y, size_x)
+        self.size_y, self.size_x = size_y, size_x
+        self.frame_buffer = FrameBuffer(size_y, size_x, self.args.bg_char)
+        self.streams = self.build_streams(size_y, size_x)
+        self.free_columns.reset(range(0, size_x, self.spacer))
+        self.y_list = [y for y in range(0, size_y)]
+        self.clear_lines()
+        self.clear_screen()
+
+    def tick(self) -> bool:
+        """
+        Draw a frame, wait for the next one and handle a key. Returns False
+        when the Matrix should stop.
+        """
+        self.resume_screen()
+        frame_start = time.perf_counter()
+        if self.handle_resize():
+            return True
+        if not self.draw_frame(frame_start):
+            return False
+        if not self.args.benchmark:
+            self.pacer.wait(self.frame_period())
+        self.phases.lap("pacing")
+        quit_matrix = self.handle_input()
+        self.phases.lap("input")
+        if quit_matrix:
+            return False
+        return self.end_frame(frame_start)
+
+    def draw_frame(self, frame_start: float) -> bool:
+        """ Draw the next frame. Returns False when the run timer is up. """
+        phases = self.phases
+        if self.wake_up is not None:
+            if not self.wake_up.advance(self.screen):
+                self.end_wake_up()
+            phases.lap("wake_up")
+            return not self.time_is_up()
+        self.add_lines(self.size_y, self.size_x)
+        phases.lap("add_lines")
+        if self.color_mode == "cycle":
+            if next(self.color_cycle_count) == self.color_cycle_delay:
+                color = list(CURSES_COLOR.keys())[next(self.color_cycle)]
+                setup_curses_colors(color,
+                                    self.args.background,
+                                    self.args.over_ride,
+                                    self.screen.init_pair)
+                self.color_cycle_count = itertools.count(start=0, step=1)
+        phases.lap("color_cycle")
+        if self.dir == "old scrolling":
+            self.display_old_scrolling()
+        else:
+            self.display_normal_scrolling()
+        phases.lap("display")
+        if self.suspended:
+            # the terminal is handed back, resume_screen redraws it all
+            self.frame_buffer.compact()
+        elif self.screen.output_busy():
+            # the last frame is still going out, its changes stay in the
+            # frame buffer and are sent together with the next frame's
+            self.stats.frames_not_sent += 1
+            self.frame_buffer.compact()
+        else:
+            self.frame_buffer.flush(self.screen)
+        if self.key_time is not None:
+            self.stats.key_latencies.append(time.perf_counter() -
+                                            self.key_time)
+            self.key_time = None
+        if self.args.checksum:
+            self.checksums.append(self.frame_buffer.checksum())
+        phases.lap("refresh")
+        if self.args.wakeup:
+            self.handle_wake_up()
+        phases.lap("wake_up")
+        if self.time_is_up():
+            return False
+        if self.governor is not None:
+            work_time = time.perf_counter() - frame_start
+            if self.governor.update(work_time, self.frame_period()):
+                self.apply_governor()
+        return True
+
+    def time_is_up(self) -> bool:
+        return bool(self.args.run_timer) and time.monotonic() >= self.end_time
+
+    def end_frame(self, frame_start: float) -> bool:
+        """ Returns False once the benchmark has run all its frames. """
+        if self.args.benchmark:
+            self.stats.record(time.perf_counter() - frame_start,
+                              self.frame_buffer.cells_written,
+                              self.frame_buffer.spans_written)
+            if len(self.stats.frame_times) >= self.args.benchmark:
+                return False
+        return True
+
+    def apply_governor(self) -> None:
+        """ Switch double spaced columns on or off for the governor. """
+        if self.dir == "right" or self.dir == "left":
+            return
+        if self.governor.double_space and self.spacer == 1:
+            self.spacer = 2
+            self.governor_spacing = True
+            self.free_columns.reset(
+                [x for x in self.free_columns if x % 2 == 0], self.spacer)
+        elif not self.governor.double_space and self.governor_spacing:
+            self.spacer = 1
+            self.governor_spacing = False
+            self.free_columns.spacing = 1
+            in_use = {line.x for line in self.line_list}
+            if self.streams is not None:
+                in_use |= self.streams.in_use()
+            for x in range(1, self.size_x, 2):
+                if x not in in_use:
+                    self.free_columns.release(x)
+
+    def build_streams(self, size_y: int, size_x: int):
+        if self.streams is not None:
+            self.streams.close()
+            self.streams = None
+        if self.args.engine == "arrays" and self.args.workers:
+            return ShardedEngine(self.dir, size_x, size_y, self.args.workers)
+        elif self.args.engine == "arrays":
+            return StreamEngine(self.dir, size_x, size_y)
+        elif self.args.engine == "numpy":
+            return NumpyEngine(self.dir, size_x, size_y)
+        return None
+
+    def clear_lines(self) -> None:
+        self.line_pool.release(self.line_list)
+        self.line_list.clear()
+        if self.streams is not None:
+            self.streams.clear(self.dir)
+
+    def line_count(self) -> int:
+        if self.streams is not None:
+            return len(self.line_list) + len(self.streams)
+        return len(self.line_list)
+
+    def new_line(self, y: int, x: int, size_x: int, size_y: int) -> None:
+        if self.streams is not None:
+            self.streams.add(y, x)
+        else:
+            self.line_list.append(self.line_pool.single_line(
+                y, x, size_x, size_y, self.dir))
+
+    @property
+    def char_set(self) -> Sequence[str]:
+        return self.random_source.char_set
+
+    @char_set.setter
+    def char_set(self, char_set: Sequence[str]) -> None:
+        """ A new character set also starts a new block of glyphs. """
+        self.random_source.set_char_set(char_set)
+
+    def frame_period(self) -> float:
+        if self.args.fps:
+            return 1 / self.args.fps
+        return DELAY_SPEED[self.args.delay]
+
+    def clear_screen(self) -> None:
+        self.screen.clear()
+        self.screen.refresh()
+        self.frame_buffer.clear(self.args.bg_char)
 
     def handle_input(self) -> bool:
         """
         Returns True: Break. Quit the matrix
         Returns False: Continue running the matrix
         """
-        ch = self.screen.getch()
-        if ch == -1:
+        keys = self.read_keys()
+        if not keys:
             return False
         elif self.args.screen_saver:
             return True
-        elif ch in [81, 113]:  # q, Q
+        elif 81 in keys or 113 in keys:  # q, Q
             return True
-        elif self.args.disable_keys:
+        elif self.wake_up is not None:  # any other key skips the wake up
+            self.end_wake_up()
             return False
+        self.key_queue.extend(coalesce_keys(keys))
+        quit_matrix = False
+        while self.key_queue and not quit_matrix:
+            if self.args.disable_keys:
+                self.key_queue.clear()
+                break
+            quit_matrix = self.handle_key(self.key_queue.popleft())
+        self.key_queue.clear()
+        self.render_state.rebuild(self.args, self.color_mode)
+        return bool(quit_matrix)
+
+    def read_keys(self) -> List[int]:
+        """ Read every key waiting on the screen, oldest first. """
+        if self.key_reader is not None:
+            presses = self.key_reader.get_presses()
+            if presses and self.key_time is None:
+                self.key_time = presses[0].time
+            return [press.key for press in presses]
+        keys = []
+        while len(keys) < MAX_KEYS_PER_FRAME:
+            ch = self.screen.getch()
+            if ch == -1:
+                break
+            keys.append(ch)
+        return keys
+
+    def getch(self) -> int:
+        if self.key_reader is not None:
+            return self.key_reader.getch()
+        return self.screen.getch()
+
+    def wait_key(self) -> int:
+        """
+        Sleep until a key is pressed, -1 when there is no input. A SIGCONT
+        during the wait takes the terminal back and carries on waiting.
+        """
+        if self.key_queue:
+            return self.key_queue.popleft()
+        while True:
+            if self.key_reader is not None:
+                ch = self.key_reader.wait_key()
+            else:
+                ch = self.screen.wait_key(self.wake_read)
+            self.resume_screen()
+            if ch != KEY_WOKEN:
+                return ch
+
+    def handle_key(self, ch: int) -> Optional[bool]:
         if ch in WAKE_UP_KEYS:
             self.keys_pressed.append(ch)
             if self.keys_pressed == WAKE_UP_KEYS:
-                wake_up_neo(self.screen, self.args.test_mode)
-                while self.screen.getch() != -1:  # clears out the buffer
-                    pass
+                self.start_wake_up()
+                self.key_queue.clear()
                 self.keys_pressed = []
-                self.screen.bkgd(self.args.bg_char, curses.color_pair(1))
                 return False
             elif len(self.keys_pressed) >= 4:
                 self.keys_pressed = []
                 return False
-        # commands
+        return self.run_command(ch)
+
+    def run_command(self, ch: int) -> Optional[bool]:
+        """
+        Returns True: Quit the matrix
+        """
         if ch == 98:  # b
             self.args.bold_on = True
             self.args.bold_all = False
@@ -408,41 +2460,41 @@ class Matrix:
             # r, t, y, u, i, o, p, [
             self.args.color = CURSES_CH_CODES_COLOR[ch]
             setup_curses_colors(self.args.color, self.args.background,
-                                self.args.over_ride)
+                                self.args.over_ride, self.screen.init_pair)
             self.color_mode = "normal"
         elif ch in [82, 84, 89, 85, 73, 79, 80, 123]:
             # R, T, Y, U, I, O, P, {
             self.args.lead_color = CURSES_CH_CODES_COLOR[ch]
             curses_lead_color(self.args.lead_color, self.args.background,
-                              self.args.over_ride)
+                              self.args.over_ride, self.screen.init_pair)
         elif ch in [18, 20, 25, 21, 9, 15, 16, 27]:
             # ctrl R, T, Y, U, I, O, P, [
             self.args.background = CURSES_CH_CODES_COLOR[ch]
             setup_curses_colors(self.args.color, self.args.background,
-                                self.args.over_ride)
+                                self.args.over_ride, self.screen.init_pair)
             curses_lead_color(self.args.lead_color, self.args.background,
-                              self.args.over_ride)
-            self.screen.bkgd(self.args.bg_char, curses.color_pair(1))
+                              self.args.over_ride, self.screen.init_pair)
+            self.screen.bkgd(self.args.bg_char, self.screen.color_pair(1))
         elif ch == 97:  # a
             self.args.async_scroll = not self.args.async_scroll
         elif ch == 109:  # m
             if self.color_mode in ["random", "normal", "cycle"]:
                 self.color_mode = "multiple"
                 setup_curses_colors("random", self.args.background,
-                                    self.args.over_ride)
+                                    self.args.over_ride, self.screen.init_pair)
             else:
                 self.color_mode = "normal"
                 setup_curses_colors("green", self.args.background,
-                                    self.args.over_ride)
+                                    self.args.over_ride, self.screen.init_pair)
         elif ch == 77:  # M
             if self.color_mode in ["multiple", "normal", "cycle"]:
                 self.color_mode = "random"
                 setup_curses_colors("random", self.args.background,
-                                    self.args.over_ride)
+                                    self.args.over_ride, self.screen.init_pair)
             else:
                 self.color_mode = "normal"
                 setup_curses_colors("green", self.args.background,
-                                    self.args.over_ride)
+                                    self.args.over_ride, self.screen.init_pair)
         elif ch == 99:  # c
             if self.color_mode in ["random", "multiple", "normal"]:
                 self.color_mode = "cycle"
@@ -453,13 +2505,12 @@ class Matrix:
                 return False
             if self.spacer == 1:
                 self.spacer = 2
-                self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
-                self.line_list.clear()
-                self.screen.clear()
-                self.screen.refresh()
+                self.free_columns.reset(range(0, self.size_x, self.spacer))
+                self.clear_lines()
+                self.clear_screen()
             else:
                 spacer = 1
-                self.x_list = [x for x in range(0, curses.COLS, spacer)]
+                self.free_columns.reset(range(0, self.size_x, spacer))
         elif ch == 101:  # e
             self.args.zero_one = False
             if self.args.ext or self.args.ext_only:
@@ -486,49 +2537,43 @@ class Matrix:
                 self.dir = "down"
             else:
                 self.dir = "up"
-            self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
-            self.line_list.clear()
-            self.screen.clear()
-            self.screen.refresh()
+            self.free_columns.reset(range(0, self.size_x, self.spacer))
+            self.clear_lines()
+            self.clear_screen()
         elif ch == 115:  # s
             self.dir = "down" if self.dir == "old scroll" else "old scroll"
-            self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
-            self.screen.clear()
-            self.screen.refresh()
-            self.line_list.clear()
+            self.free_columns.reset(range(0, self.size_x, self.spacer))
+            self.clear_screen()
+            self.clear_lines()
             time.sleep(0.2)
         elif ch == 261:  # right arrow
             if self.dir != "right":
                 self.dir = "right"
-                self.line_list.clear()
-                self.screen.clear()
-                self.screen.refresh()
+                self.clear_lines()
+                self.clear_screen()
                 time.sleep(0.4)
-                self.y_list = [y for y in range(1, curses.LINES)]
+                self.y_list = [y for y in range(1, self.size_y)]
         elif ch == 260:  # left arrow
             if self.dir != "left":
                 self.dir = "left"
-                self.line_list.clear()
-                self.screen.clear()
-                self.screen.refresh()
+                self.clear_lines()
+                self.clear_screen()
                 time.sleep(0.4)
-                self.y_list = [y for y in range(1, curses.LINES)]
+                self.y_list = [y for y in range(1, self.size_y)]
         elif ch == 259:  # up arrow
             if self.dir != "up":
                 self.dir = "up"
-                self.line_list.clear()
-                self.screen.clear()
-                self.screen.refresh()
+                self.clear_lines()
+                self.clear_screen()
                 time.sleep(0.4)
-                self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
+                self.free_columns.reset(range(0, self.size_x, self.spacer))
         elif ch == 258:  # down arrow
             if self.dir != "down":
                 self.dir = "down"
-                self.line_list.clear()
-                self.screen.clear()
-                self.screen.refresh()
+                self.clear_lines()
+                self.clear_screen()
                 time.sleep(0.3)
-                self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
+                self.free_columns.reset(range(0, self.size_x, self.spacer))
         elif ch in [100, 68]:  # d, D
             self.args.zero_one = False
             self.args.bold_on = False
@@ -539,49 +2584,49 @@ class Matrix:
             self.args.ext = False
             self.args.ext_only = False
             setup_curses_colors(self.args.color, self.args.background,
-                                self.args.over_ride)
+                                self.args.over_ride, self.screen.init_pair)
             curses_lead_color(self.args.lead_color, self.args.background,
-                              self.args.over_ride)
+                              self.args.over_ride, self.screen.init_pair)
             self.color_mode = "normal"
             self.args.async_scroll = False
             self.args.delay = 4
+            self.args.fps = 0
             self.args.Katakana_only = False
             self.args.katakana = False
             if self.dir != "down":
                 self.dir = "down"
-                self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
-                self.screen.clear()
-                self.screen.refresh()
-                self.line_list.clear()
+                self.free_columns.reset(range(0, self.size_x, self.spacer))
+                self.clear_screen()
+                self.clear_lines()
                 time.sleep(0.2)
             self.args.do_not_clear = False
             self.args.italic = False
             if self.spacer == 2:
                 self.spacer = 1
-                self.x_list = [x for x in range(0, curses.COLS, self.spacer)]
+                self.free_columns.reset(range(0, self.size_x, self.spacer))
             self.char_set = build_character_set2(self.args)
             self.args.bg_char = DEFAULT_BG_CHAR
-            self.screen.bkgd(self.args.bg_char, curses.color_pair(1))
+            self.screen.bkgd(self.args.bg_char, self.screen.color_pair(1))
         elif (self.color_mode == "cycle" and
               ch in CURSES_CH_CODES_CYCLE_DELAY.keys()):
             self.color_cycle_delay = 100 * CURSES_CH_CODES_CYCLE_DELAY[ch]
         elif 48 <= ch <= 57:  # number keys 0 to 9
             self.args.delay = int(chr(ch))
+            self.args.fps = 0
         elif ch == 87:  # W
             self.args.do_not_clear = not self.args.do_not_clear
         elif ch == 119:  # w
-            self.screen.clear()
-            self.screen.refresh()
-            self.line_list.clear()
+            self.clear_screen()
+            self.clear_lines()
             time.sleep(2)
             return False
         elif ch == 106:  # j
             self.args.italic = not self.args.italic
         elif ch == 102:  # f
-            # Freeze the Matrix
+            # Freeze the Matrix, sleeping until the next key
             while True:
-                ch = self.screen.getch()
-                if ch == 102:
+                ch = self.wait_key()
+                if ch in [-1, 102]:  # -1 when no key can ever come
                     break
                 elif ch in [81, 113]:  # q, Q
                     return True
@@ -599,62 +2644,78 @@ class Matrix:
 
     def handle_wake_up(self) -> None:
         if self.wake_up_time <= 0:
-            wake_up_neo(self.screen, self.args.test_mode)
+            self.start_wake_up()
             self.wake_up_time = random.randint(2000, 3000)
-            while self.screen.getch() != -1:  # clears out the buffer
-                ...
-            self.screen.bkgd(self.args.bg_char, curses.color_pair(1))
         else:
             self.wake_up_time -= 1
 
+    def start_wake_up(self) -> None:
+        self.wake_up = WakeUpSequence(self.args.test_mode)
+
+    def end_wake_up(self) -> None:
+        """ Put the rain back on the screen as it was before. """
+        self.wake_up = None
+        self.screen.bkgd(self.args.bg_char, self.screen.color_pair(1))
+        self.screen.erase()
+        self.frame_buffer.invalidate(self.args.bg_char)
+        self.frame_buffer.flush(self.screen)
+
     def add_lines(self, size_y: int, size_x: int) -> None:
+        spawn_count = 2
+        max_lines = size_x - 1
+        if self.governor is not None:
+            spawn_count = self.governor.spawn_count
+            max_lines = int(max_lines * self.governor.line_fraction)
         if self.dir == "right" or self.dir == "left":
-            y = random.choice(self.y_list)
-            self.line_list.append(SingleLine(y, 0, size_x, size_y,self.dir))
+            # sideways streams are only capped once the governor backs off
+            if (self.governor is None or self.governor.line_fraction == 1.0
+                    or self.line_count() < max_lines):
+                y = random.choice(self.y_list)
+                self.new_line(y, 0, size_x, size_y)
         elif self.dir == "old scrolling":
-            if len(self.line_list) < size_x - 1 and len(self.x_list) > 3:
-                for _ in range(2):
-                    x = random.choice(self.x_list)
-                    self.x_list.pop(self.x_list.index(x))
-                    self.line_list.append(OldScrollingLine(x, size_x, size_y))
-        else:  # down and up
-            if len(self.line_list) < size_x - 1 and len(self.x_list) > 3:
-                for _ in range(2):
-                    x = random.choice(self.x_list)
-                    self.x_list.pop(self.x_list.index(x))
+            if len(self.line_list) < max_lines and len(self.free_columns) > 3:
+                for _ in range(spawn_count):
+                    x = self.free_columns.acquire()
                     self.line_list.append(
-                        SingleLine(0, x, size_x, size_y, self.dir))
+                        self.line_pool.old_scrolling_line(x, size_x, size_y))
+        else:  # down and up
+            if self.line_count() < max_lines and len(self.free_columns) > 3:
+                for _ in range(spawn_count):
+                    x = self.free_columns.acquire()
+                    self.new_line(0, x, size_x, size_y)
 
     def display_old_scrolling(self) -> None:
         remove_list = []
+        state = self.render_state
         for line in self.line_list:
-            if self.args.bold_all:
-                bold = curses.A_BOLD
-            elif self.args.bold_on and line.bold:
-                bold = curses.A_BOLD
-            else:
-                bold = curses.A_NORMAL
-
-            italic = curses.A_ITALIC if self.args.italic else curses.A_NORMAL
-            color = curses.color_pair(line.line_color_number)
+            bold = state.bold or (state.bold_random and line.bold)
             if lead := line.get_lead():
-                self.screen.addstr(lead[0], lead[1], lead[2],
-                              curses.color_pair(10) + bold + italic)
+                self.frame_buffer.put(lead[0], lead[1], lead[2],
+                                      state.lead[bold])
             if remove := line.delete_last():
-                self.screen.addstr(remove[0], remove[1], self.args.bg_char)
-                if line.x not in self.x_list:
-                    self.x_list.append(line.x)
-            location_char_list = line.get_next()
-            for cell in location_char_list:
-                self.screen.addstr(*cell, color + bold + italic)
+                self.frame_buffer.put(remove[0], remove[1], self.args.bg_char)
+                self.free_columns.release(line.x)
+            line.advance()
+            attr = state.colors[line.line_color_number][bold]
+            y = line.top + len(line.trail) - 1
+            for glyph in line.trail:
+                self.frame_buffer.put(y, line.x, glyph, attr)
+                y -= 1
             if line.okay_to_delete():
                 remove_list.append(line)
-        self. screen.refresh()
-        for rem in remove_list:
-            self.line_list.pop(self.line_list.index(rem))
+        if remove_list:
+            self.retire_lines(remove_list)
 
     def display_normal_scrolling(self) -> None:
+        if self.streams is not None:
+            self.streams.draw(self.frame_buffer, self.render_state,
+                              self.random_source, self.args.bg_char,
+                              not self.args.do_not_clear,
+                              self.args.async_scroll, self.free_columns)
+            return
         remove_list = []
+        state = self.render_state
+        source = self.random_source
         for line in self.line_list:
             if self.args.async_scroll and not line.async_scroll_turn():
                 # Not the line's turn in async scroll mode then
@@ -662,39 +2723,35 @@ class Matrix:
                 continue
             if remove_line := line.delete_last():
                 if self.args.do_not_clear is False:
-                    self.screen.addstr(remove_line[0], remove_line[1], self.args.bg_char)
-                if line.x not in self.x_list:
-                    self.x_list.append(line.x)
-
-            if self.args.bold_all:
-                bold = curses.A_BOLD
-            elif self.args.bold_on:
-                if random.randint(1, 3) <= 1:
-                    bold = curses.A_BOLD
-                else:
-                    bold = curses.A_NORMAL
-            else:
-                bold = curses.A_NORMAL
+                    self.frame_buffer.put(remove_line[0], remove_line[1],
+                                          self.args.bg_char)
+                self.free_columns.release(line.x)
 
-            italic = curses.A_ITALIC if self.args.italic else curses.A_NORMAL
-            if self.color_mode == "random":
-                color = curses.color_pair(random.randint(1, 7))
+            if state.bold_random:
+                bold = source.next_bold()
+            else:
+                bold = state.bold
+            if state.random_color:
+                color = state.colors[source.next_color()]
             else:
-                color = curses.color_pair(line.line_color_number)
+                color = state.colors[line.line_color_number]
             if new_char := line.get_next():
-                self.screen.addstr(new_char[0],
-                              new_char[1],
-                              random.choice(self.char_set),
-                              color + bold + italic)
+                self.frame_buffer.put(new_char[0], new_char[1],
+                                      source.next_glyph(), color[bold])
             if lead_char := line.get_lead():
-                self.screen.addstr(lead_char[0], lead_char[1],
-                              random.choice(self.char_set),
-                              curses.color_pair(10) + bold + italic)
+                self.frame_buffer.put(lead_char[0], lead_char[1],
+                                      source.next_glyph(), state.lead[bold])
             if line.okay_to_delete():
                 remove_list.append(line)
-        self. screen.refresh()
-        for rem in remove_list:
-            self.line_list.pop(self.line_list.index(rem))
+        if remove_list:
+            self.retire_lines(remove_list)
+
+    def retire_lines(self, finished: list) -> None:
+        """ Drop the finished lines in one pass, keeping the order. """
+        self.line_pool.release(finished)
+        finished = set(finished)
+        self.line_list[:] = [line for line in self.line_list
+                             if line not in finished]
 
     @classmethod
     def check_screen_size(cls, size_y: int, size_x: int) -> None:
@@ -704,61 +2761,93 @@ class Matrix:
             raise PyMatrixError("Error screen width is to narrow.")
 
     def setup_colors(self) -> None:
-        setup_curses_wake_up_colors(self.args.over_ride)
-        curses_lead_color(self.args.lead_color,
-                          self.args.background, self.args.over_ride)
+        setup_curses_wake_up_colors(self.args.over_ride, self.screen.init_pair)
+        curses_lead_color(self.args.lead_color, self.args.background,
+                          self.args.over_ride, self.screen.init_pair)
         if self.args.color_number is not None:
             setup_curses_color_number(self.args.color_number,
-                                      self.args.background, self.args.over_ride)
+                                      self.args.background, self.args.over_ride,
+                                      self.screen.init_pair)
         else:
             setup_curses_colors(self.args.color, self.args.background,
-                                self.args.over_ride)
+                                self.args.over_ride, self.screen.init_pair)
+
 
+def build_character_set2(args: argparse.Namespace) -> Tuple[str, ...]:
+    new_set = character_set(args.zero_one, args.ext_only, args.Katakana_only,
+                            args.katakana, args.ext, args.test_mode)
+    OldScrollingLine.update_char_list(new_set)
+    return new_set
 
-def build_character_set2(args: argparse.Namespace):
-    if args.zero_one:
+
+@functools.lru_cache(maxsize=None)
+def character_set(zero_one: bool, ext_only: bool, katakana_only: bool,
+                  katakana: bool, ext: bool,
+                  test_mode: bool) -> Tuple[str, ...]:
+    """
+    The character set for the flags. Each set is only built once and is
+    handed out as the same tuple of interned glyphs after that. The
+    glyphs' encoded form and width are worked out as the set is built.
+    """
+    if zero_one:
         new_list = ["0", "1"]
-    elif args.ext_only and args.test_mode:
+    elif ext_only and test_mode:
         new_list = ["Ä"]
-    elif args.ext_only:
+    elif ext_only:
         new_list = EXT_CHAR_LIST
-    elif args.Katakana_only and args.test_mode:
+    elif katakana_only and test_mode:
         new_list = ["ﾎ", "0"]
-    elif args.Katakana_only:
+    elif katakana_only:
         new_list = KATAKANA_CHAR_LIST + KATAKANA_CHAR_LIST_ADDON
-    elif args.katakana and args.ext and args.test_mode:
+    elif katakana and ext and test_mode:
         new_list = ["T", "ﾎ", "Ä"]
-    elif args.katakana and args.ext:
+    elif katakana and ext:
         new_list = KATAKANA_CHAR_LIST + EXT_CHAR_LIST + CHAR_LIST
-    elif args.ext and args.test_mode:
+    elif ext and test_mode:
         new_list = ["Ä", "T"]
-    elif args.ext:
+    elif ext:
         new_list = CHAR_LIST + EXT_CHAR_LIST
-    elif args.katakana and args.test_mode:
+    elif katakana and test_mode:
         new_list = ["T", "ﾎ"]
-    elif args.katakana:
+    elif katakana:
         new_list = CHAR_LIST + KATAKANA_CHAR_LIST
-    elif args.test_mode:
+    elif test_mode:
         new_list = ["T"]
     else:
         new_list = CHAR_LIST
-    OldScrollingLine.update_char_list(new_list)
-    return new_list
+    for glyph in new_list:
+        encode_glyphs(glyph)
+    return tuple(sys.intern(glyph) for glyph in new_list)
+
+
+@functools.lru_cache(maxsize=4096)
+def encode_glyphs(text: str) -> Tuple[bytes, int]:
+    """ UTF-8 bytes of text and how many columns it takes on screen. """
+    width = 0
+    for ch in text:
+        if unicodedata.combining(ch):
+            continue
+        width += 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+    return text.encode(), width
 
 
-def curses_lead_color(color: str, bg_color: str, over_ride: bool) -> None:
+def curses_lead_color(color: str, bg_color: str, over_ride: bool,
+                      init_pair: Optional[Callable] = None) -> None:
+    init_pair = init_pair or curses.init_pair
     if over_ride:
-        curses.init_pair(10, CURSES_OVER_RIDE_COLORS[color],
-                         CURSES_OVER_RIDE_COLORS[bg_color])
+        init_pair(10, CURSES_OVER_RIDE_COLORS[color],
+                  CURSES_OVER_RIDE_COLORS[bg_color])
     else:
-        curses.init_pair(10, CURSES_COLOR[color], CURSES_COLOR[bg_color])
+        init_pair(10, CURSES_COLOR[color], CURSES_COLOR[bg_color])
 
 
 def setup_curses_color_number(
         color_num: int,
         bg_color: str,
-        override: bool) -> None:
+        override: bool,
+        init_pair: Optional[Callable] = None) -> None:
 
+    init_pair = init_pair or curses.init_pair
     if override:
         bg = CURSES_OVER_RIDE_COLORS[bg_color]
     else:
@@ -766,11 +2855,13 @@ def setup_curses_color_number(
 
     color_list = [color_num for _ in range(7)]
     for x, c in enumerate(color_list):
-        curses.init_pair(x + 1, c, bg)
+        init_pair(x + 1, c, bg)
 
 
-def setup_curses_colors(color: str, bg_color: str, over_ride: bool) -> None:
+def setup_curses_colors(color: str, bg_color: str, over_ride: bool,
+                        init_pair: Optional[Callable] = None) -> None:
     """ Init colors pairs in the curses. """
+    init_pair = init_pair or curses.init_pair
     if over_ride:
         curses_colors = CURSES_OVER_RIDE_COLORS
     else:
@@ -780,42 +2871,20 @@ def setup_curses_colors(color: str, bg_color: str, over_ride: bool) -> None:
     else:
         color_list = [color for _ in range(7)]
     for x, c in enumerate(color_list):
-        curses.init_pair(x + 1, curses_colors[c], curses_colors[bg_color])
+        init_pair(x + 1, curses_colors[c], curses_colors[bg_color])
 
 
-def setup_curses_wake_up_colors(override: bool) -> None:
+def setup_curses_wake_up_colors(
+        override: bool, init_pair: Optional[Callable] = None) -> None:
+    init_pair = init_pair or curses.init_pair
     if override:
-        curses.init_pair(WAKE_UP_PAIR,
-                         CURSES_OVER_RIDE_COLORS["green"],
-                         CURSES_OVER_RIDE_COLORS["black"])
+        init_pair(WAKE_UP_PAIR,
+                  CURSES_OVER_RIDE_COLORS["green"],
+                  CURSES_OVER_RIDE_COLORS["black"])
     else:
-        curses.init_pair(WAKE_UP_PAIR,
-                         CURSES_COLOR["green"],
-                         CURSES_COLOR["black"])
-
-
-def wake_up_neo(screen, test_mode: bool) -> None:
-    z = 0.06 if test_mode else 1  # For test mode - shorter test time
-    screen.erase()
-    screen.bkgd(" ", curses.color_pair(WAKE_UP_PAIR))
-    screen.refresh()
-    time.sleep(3 * z)
-    display_text(screen, "Wake up, Neo...", 0.08 * z, 7.0 * z)
-    display_text(screen, "The Matrix has you...", 0.25 * z, 7.0 * z)
-    display_text(screen, "Follow the white rabbit.", 0.1 * z, 7.0 * z)
-    display_text(screen, "Knock, knock, Neo.", 0.01 * z, 3.0 * z)
-    time.sleep(2 * z)
-
-
-def display_text(screen, text: str, type_time: float, hold_time: float) -> None:
-    for i, letter in enumerate(text, start=1):
-        screen.addstr(1, i, letter,
-                      curses.color_pair(WAKE_UP_PAIR) + curses.A_BOLD)
-        screen.refresh()
-        time.sleep(type_time)
-    time.sleep(hold_time)
-    screen.erase()
-    screen.refresh()
+        init_pair(WAKE_UP_PAIR,
+                  CURSES_COLOR["green"],
+                  CURSES_COLOR["black"])
 
 
 def positive_int_zero_to_nine(value: str) -> int:
@@ -886,6 +2955,21 @@ def background_character(value: str) -> str:
         raise argparse.ArgumentTypeError(msg)
 
 
+def screen_size(value: str) -> Tuple[int, int]:
+    """
+    Used by argparse. Checks for a WIDTHxHEIGHT size like 400x120 and
+    returns (width, height).
+    """
+    msg = f"{value} is an invalid size. Use WIDTHxHEIGHT like 400x120"
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(msg)
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(msg)
+    return width, height
+
+
 def list_colors() -> None:
     color_dict = {"red": "\033[91m", "green": "\033[92m", "blue": "\033[94m", "cyan": "\033[96m",
                   "yellow": "\033[93m", "magenta": "\033[95m", "white": "\033[97m", "black": "\033[90m"}
@@ -940,6 +3024,23 @@ def argument_parsing(
                         default=4,
                         help="Set the delay (speed)"
                              " 0: Fast, 4: Default, 9: Slow")
+    parser.add_argument("--fps", type=positive_int, default=0,
+                        help="Target frames per second. Overrides -d until "
+                             "a delay key is pressed")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="Run on an asyncio event loop that handles keys "
+                             "as soon as they are pressed")
+    parser.add_argument("--key_thread", action="store_true",
+                        help="Read keys on a background thread and report "
+                             "the key to screen latency with --profile")
+    parser.add_argument("--writer_thread", action="store_true",
+                        help="With --backend ansi write to the terminal on a "
+                             "background thread and skip sending frames "
+                             "while it is behind")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Back off the amount of rain when frames run "
+                             "over their time and restore it when there is "
+                             "time to spare")
     parser.add_argument("-b", dest="bold_on", action="store_true",
                         help="Bold characters on")
     parser.add_argument("-B", dest="bold_all", action="store_true",
@@ -1014,6 +3115,40 @@ def argument_parsing(
     parser.add_argument("--disable_keys", action="store_true",
                         help="Disable keys except for Q to quit. Screensaver "
                              "mode will not be affected")
+    parser.add_argument("--backend", choices=BACKENDS, default="curses",
+                        help="Output backend. ansi draws without curses. "
+                             "null and record are headless. "
+                             "Default is curses")
+    parser.add_argument("--engine", choices=ENGINES, default="lines",
+                        help="How the falling streams are kept. arrays keeps "
+                             "them all in one set of arrays and is faster "
+                             "on big screens. numpy moves them with NumPy "
+                             "for very big screens. Default is lines")
+    parser.add_argument("--workers", type=positive_int, metavar="NUMBER",
+                        help="With --engine arrays move the streams in this "
+                             "many worker processes, each with its own "
+                             "share of the columns. Only faster with more "
+                             "than one CPU. With --seed the rain differs "
+                             "from --engine arrays on its own")
+    parser.add_argument("--size", type=screen_size, default=(80, 24),
+                        metavar="WIDTHxHEIGHT",
+                        help="Screen size for the null and record backends. "
+                             "Default is 80x24")
+    parser.add_argument("--benchmark", type=positive_int, default=0,
+                        metavar="FRAMES",
+                        help="Run FRAMES frames on a headless screen as fast "
+                             "as possible and report the frame rate, cells "
+                             "written and frame times")
+    parser.add_argument("--seed", type=int, metavar="NUMBER",
+                        help="Seed the random numbers so every run with the "
+                             "same seed and screen size draws the same rain")
+    parser.add_argument("--checksum", action="store_true",
+                        help="Print a checksum of the screen for every frame "
+                             "of a --benchmark run on exit. Use with --seed "
+                             "to compare runs")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Write cProfile data for the run to FILE and "
+                             "print the time spent in each phase on exit")
     parser.add_argument("--list_colors", action="store_true",
                         help="Show available colors and exit. ")
     parser.add_argument("--list_commands", action="store_true",
@@ -1025,7 +3160,32 @@ def argument_parsing(
                         help=argparse.SUPPRESS)
     parser.add_argument("--test_mode", action="store_true",
                         help=argparse.SUPPRESS)
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if args.engine == "numpy" and numpy is None:
+        parser.error("--engine numpy needs NumPy installed")
+    if args.workers and args.engine != "arrays":
+        parser.error("--workers needs --engine arrays")
+    if args.writer_thread and args.backend != "ansi":
+        parser.error("--writer_thread needs --backend ansi")
+    if args.checksum and not args.benchmark:
+        parser.error("--checksum needs --benchmark")
+    return args
+
+
+def run_curses(screen, args: argparse.Namespace) -> Matrix:
+    """ Used with curses.wrapper. """
+    return Matrix(CursesRenderer(screen), args)
+
+
+def build_renderer(args: argparse.Namespace) -> Renderer:
+    """ Renderer for the backends that do not need curses.wrapper. """
+    width, height = args.size
+    if args.backend == "ansi":
+        return AnsiRenderer(threaded=args.writer_thread)
+    elif args.backend == "record":
+        return RecordingRenderer(height, width)
+    else:
+        return NullRenderer(height, width)
 
 
 def main(argv: Optional[Sequence[str]] = None) -> None:
@@ -1038,15 +3198,45 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         display_commands()
         return
 
+    if args.benchmark and args.backend != "record":
+        args.backend = "null"
+
     time.sleep(args.start_timer)
     os.environ.setdefault('ESCDELAY', '25')  # 25 milliseconds
+    profiler = cProfile.Profile() if args.profile else None
     try:
-        curses.wrapper(Matrix, args)
+        if profiler is not None:
+            profiler.enable()
+        if args.backend == "curses":
+            matrix = curses.wrapper(run_curses, args)
+        else:
+            with build_renderer(args) as renderer:
+                matrix = Matrix(renderer, args)
     except KeyboardInterrupt:
         pass
     except PyMatrixError as e:
         print(e)
         return
+    else:
+        if args.benchmark:
+            print(matrix.stats.report())
+            print(matrix.line_pool.report())
+        if matrix.governor is not None:
+            print(matrix.governor.report())
+        if args.checksum:
+            for frame, checksum in enumerate(matrix.checksums, start=1):
+                print(f"frame {frame}: {checksum:08x}")
+        if profiler is not None:
+            print(matrix.phases.report())
+            if matrix.stats.key_latencies:
+                print(matrix.stats.latency_report())
+            if args.writer_thread:
+                print(f"frames not sent while the terminal was busy: "
+                      f"{matrix.stats.frames_not_sent}")
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+
+
+class FakeClock:
+    """ Clock and sleep that only move when told to. """
+    def __init__(self, now=100.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def run_matrix(test_args, screen=None):
+    """ Run Matrix to the end on a headless screen. """
+    args = pymatrix.argument_parsing(list(test_args))
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        return pymatrix.Matrix(screen or pymatrix.NullRenderer(), args)
+
+
+def build_matrix(test_args=(), screen=None):
+    """ Matrix with its screen set up but without running the main loop. """
+    with mock.patch.object(pymatrix.Matrix, "main_loop"):
+        matrix = run_matrix(test_args, screen)
+    matrix.setup_screen()
+    return matrix
+
+
+def build_state(test_args=(), color_mode="normal"):
+    state = pymatrix.RenderState(pymatrix.NullRenderer())
+    state.rebuild(pymatrix.argument_parsing(list(test_args)), color_mode)
+    return state
+
+
+def draw(engine, frame_buffer, free_columns=None, clear_tail=True,
+         async_scroll=False, state=None, char_set=("A",), bg_char=" "):
+    """ Move the streams of an engine one frame. """
+    if free_columns is None:
+        free_columns = pymatrix.ColumnPool()
+    engine.draw(frame_buffer, state or build_state(),
+                pymatrix.RandomSource(char_set), bg_char, clear_tail,
+                async_scroll, free_columns)
@@ -1,3 +1,4 @@
+from unittest import mock
 
 import pytest
 
@@ -284,6 +285,166 @@ def test_argument_parsing_background_character(test_value, expect_result):
     assert result.bg_char == expect_result
 
 
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], "curses"), (["--backend", "curses"], "curses"),
+    (["--backend", "ansi"], "ansi"), (["--backend", "null"], "null"),
+    (["--backend", "record"], "record"),
+])
+def test_argument_parsing_backend(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.backend == expected_result
+
+
+@pytest.mark.parametrize("test_value", [
+    ["--backend", "tk"], ["--backend"], ["--backend", "Curses"],
+])
+def test_argument_parsing_backend_error(test_value):
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(test_value)
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], (80, 24)), (["--size", "400x120"], (400, 120)),
+    (["--size", "10X10"], (10, 10)),
+])
+def test_argument_parsing_size(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.size == expected_result
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], 0), (["--benchmark", "100"], 100), (["--benchmark", "1"], 1),
+])
+def test_argument_parsing_benchmark(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.benchmark == expected_result
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], 0), (["--fps", "30"], 30), (["--fps", "120"], 120),
+])
+def test_argument_parsing_fps(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.fps == expected_result
+
+
+@pytest.mark.parametrize("test_value", [
+    ["--fps", "0"], ["--fps", "-5"], ["--fps", "fast"],
+])
+def test_argument_parsing_fps_error(test_value):
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(test_value)
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], False), (["--adaptive"], True),
+])
+def test_argument_parsing_adaptive(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.adaptive == expected_result
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], None), (["--profile", "run.prof"], "run.prof"),
+])
+def test_argument_parsing_profile(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.profile == expected_result
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], "lines"), (["--engine", "lines"], "lines"),
+    (["--engine", "arrays"], "arrays"),
+])
+def test_argument_parsing_engine(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.engine == expected_result
+
+
+@pytest.mark.parametrize("test_value", [
+    ["--engine", "objects"], ["--engine"],
+])
+def test_argument_parsing_engine_error(test_value):
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(test_value)
+
+
+def test_argument_parsing_engine_numpy_not_installed():
+    with mock.patch.object(pymatrix, "numpy", None):
+        with pytest.raises(SystemExit):
+            pymatrix.argument_parsing(["--engine", "numpy"])
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], None), (["--seed", "42"], 42), (["--seed", "-3"], -3),
+])
+def test_argument_parsing_seed(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.seed == expected_result
+
+
+def test_argument_parsing_seed_error():
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(["--seed", "abc"])
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], False), (["--benchmark", "5", "--checksum"], True),
+])
+def test_argument_parsing_checksum(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.checksum == expected_result
+
+
+def test_argument_parsing_checksum_needs_benchmark():
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(["--checksum"])
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], False), (["--asyncio"], True),
+])
+def test_argument_parsing_asyncio(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.asyncio == expected_result
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], False), (["--key_thread"], True),
+])
+def test_argument_parsing_key_thread(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.key_thread == expected_result
+
+
+def test_argument_parsing_writer_thread():
+    result = pymatrix.argument_parsing(["--backend", "ansi",
+                                        "--writer_thread"])
+    assert result.writer_thread is True
+    assert pymatrix.argument_parsing([]).writer_thread is False
+
+
+def test_argument_parsing_writer_thread_needs_ansi():
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(["--writer_thread"])
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ([], None), (["--engine", "arrays", "--workers", "3"], 3),
+])
+def test_argument_parsing_workers(test_value, expected_result):
+    result = pymatrix.argument_parsing(test_value)
+    assert result.workers == expected_result
+
+
+@pytest.mark.parametrize("test_value", [
+    ["--workers", "2"], ["--engine", "arrays", "--workers", "0"],
+])
+def test_argument_parsing_workers_error(test_value):
+    with pytest.raises(SystemExit):
+        pymatrix.argument_parsing(test_value)
+
+
 # testing helper functions
 @pytest.mark.parametrize("test_values, expected_results", [
     ("0", 0), ("1", 1), ("2", 2), ("3", 3), ("4", 4),
@@ -371,3 +532,18 @@ def test_background_character_error(test_value):
     with pytest.raises(pymatrix.argparse.ArgumentTypeError):
         pymatrix.background_character(test_value)
 
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("400x120", (400, 120)), ("10x10", (10, 10)), ("80X24", (80, 24)),
+])
+def test_screen_size(value, expected):
+    assert pymatrix.screen_size(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    "400", "x120", "400x", "0x10", "10x0", "-5x10", "axb", "10x10x10", "",
+])
+def test_screen_size_error(value):
+    with pytest.raises(pymatrix.argparse.ArgumentTypeError):
+        pymatrix.screen_size(value)
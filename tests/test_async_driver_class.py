@@ -0,0 +1,84 @@
+import os
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import run_matrix
+
+
+class PipeRenderer(pymatrix.NullRenderer):
+    """ Headless screen that reads its keys from a pipe. """
+    def __init__(self):
+        super().__init__(20, 60)
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.read_fd, False)
+
+    def fileno(self):
+        return self.read_fd
+
+    def getch(self):
+        try:
+            data = os.read(self.read_fd, 1)
+        except BlockingIOError:
+            return -1
+        return data[0] if data else -1
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+def checksums(test_args):
+    matrix = run_matrix(["--benchmark", "40", "--seed", "4", "--checksum"] +
+                        test_args, pymatrix.NullRenderer(20, 60))
+    return matrix.checksums
+
+
+def test_null_renderer_has_no_fileno():
+    assert pymatrix.NullRenderer().fileno() is None
+
+
+def test_benchmark_runs_all_frames():
+    matrix = run_matrix(["--benchmark", "25", "--asyncio"],
+                        pymatrix.NullRenderer(20, 60))
+    assert len(matrix.stats.frame_times) == 25
+
+
+@pytest.mark.parametrize("test_args", [[], ["-o"], ["--engine", "arrays"]])
+def test_same_frames_as_sleeping_loop(test_args):
+    assert checksums(test_args + ["--asyncio"]) == checksums(test_args)
+
+
+def test_run_timer_stops_driver():
+    matrix = run_matrix(["-R", "1", "--asyncio", "--fps", "50"],
+                        pymatrix.NullRenderer(20, 60))
+    assert matrix.frame_buffer.cells_written > 0
+
+
+def test_key_press_quits():
+    screen = PipeRenderer()
+    os.write(screen.write_fd, b"q")
+    try:
+        matrix = run_matrix(["--asyncio"], screen)
+    finally:
+        screen.close()
+    assert matrix.line_list != []
+
+
+def test_key_press_changes_delay():
+    screen = PipeRenderer()
+    os.write(screen.write_fd, b"0")
+    try:
+        matrix = run_matrix(["--asyncio", "--benchmark", "20"], screen)
+    finally:
+        screen.close()
+    assert matrix.args.delay == 0
+
+
+def test_error_in_frame_raised():
+    screen = pymatrix.NullRenderer(20, 60)
+    with mock.patch.object(pymatrix.Matrix, "draw_frame",
+                           side_effect=pymatrix.PyMatrixError("boom")):
+        with pytest.raises(pymatrix.PyMatrixError):
+            run_matrix(["--asyncio", "--benchmark", "5"], screen)
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from pymatrix import pymatrix
+
+
+def test_init():
+    pool = pymatrix.ColumnPool(range(0, 6, 2))
+    assert list(pool) == [0, 2, 4]
+    assert len(pool) == 3
+    assert pool.position == {0: 0, 2: 1, 4: 2}
+
+
+def test_init_empty():
+    pool = pymatrix.ColumnPool()
+    assert len(pool) == 0
+    assert 0 not in pool
+
+
+def test_contains():
+    pool = pymatrix.ColumnPool([1, 5])
+    assert 5 in pool
+    assert 3 not in pool
+
+
+def test_acquire():
+    pool = pymatrix.ColumnPool(range(5))
+    with mock.patch.object(pymatrix.random, "choice", return_value=1):
+        assert pool.acquire() == 1
+    assert 1 not in pool
+    assert list(pool) == [0, 4, 2, 3]
+    assert pool.position == {0: 0, 4: 1, 2: 2, 3: 3}
+
+
+def test_acquire_last():
+    pool = pymatrix.ColumnPool(range(3))
+    with mock.patch.object(pymatrix.random, "choice", return_value=2):
+        assert pool.acquire() == 2
+    assert list(pool) == [0, 1]
+    assert pool.position == {0: 0, 1: 1}
+
+
+def test_acquire_all():
+    pool = pymatrix.ColumnPool(range(10))
+    taken = [pool.acquire() for _ in range(10)]
+    assert sorted(taken) == list(range(10))
+    assert len(pool) == 0
+    assert pool.position == {}
+
+
+def test_release():
+    pool = pymatrix.ColumnPool([0, 1])
+    pool.release(7)
+    assert list(pool) == [0, 1, 7]
+    assert pool.position[7] == 2
+
+
+def test_release_free_column_is_ignored():
+    pool = pymatrix.ColumnPool([0, 1])
+    pool.release(1)
+    assert list(pool) == [0, 1]
+
+
+def test_release_skips_columns_off_spacing():
+    pool = pymatrix.ColumnPool()
+    pool.reset([0, 2], 2)
+    pool.release(3)
+    pool.release(4)
+    assert list(pool) == [0, 2, 4]
+    pool.reset([0, 2])
+    pool.release(3)
+    assert list(pool) == [0, 2, 3]
+
+
+def test_remove():
+    pool = pymatrix.ColumnPool([3, 4, 5])
+    pool.remove(3)
+    assert list(pool) == [5, 4]
+    assert pool.position == {5: 0, 4: 1}
+
+
+def test_reset():
+    pool = pymatrix.ColumnPool([3, 4, 5])
+    pool.reset(range(0, 4, 2))
+    assert list(pool) == [0, 2]
+    assert pool.position == {0: 0, 2: 1}
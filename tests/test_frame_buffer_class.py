@@ -0,0 +1,214 @@
+from unittest import mock
+
+from pymatrix import pymatrix
+
+
+def test_init():
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    assert frame_buffer.glyphs == [" "] * 12
+    assert frame_buffer.attrs == [0] * 12
+    assert frame_buffer.front_glyphs == [" "] * 12
+    assert frame_buffer.dirty == []
+
+
+def test_init_bg_char():
+    frame_buffer = pymatrix.FrameBuffer(3, 4, "x")
+    assert frame_buffer.glyphs == ["x"] * 12
+    assert frame_buffer.front_glyphs == ["x"] * 12
+
+
+def test_put():
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    assert frame_buffer.glyphs[6] == "T"
+    assert frame_buffer.attrs[6] == 5
+    assert frame_buffer.dirty == [6]
+
+
+def test_flush_writes_changed_cells():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.put(2, 0, "A", 0)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(1, 2, "T", 5), mock.call(2, 0, "A", 0)
+    ]
+    assert screen.refresh.call_count == 1
+    assert frame_buffer.cells_written == 2
+    assert frame_buffer.dirty == []
+
+
+def test_flush_skips_unchanged_cells():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.flush(screen)
+    screen.reset_mock()
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.put(0, 0, " ", 0)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_count == 0
+    assert screen.refresh.call_count == 1
+    assert frame_buffer.cells_written == 0
+
+
+def test_flush_attr_change():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.flush(screen)
+    screen.reset_mock()
+    frame_buffer.put(1, 2, "T", 6)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [mock.call(1, 2, "T", 6)]
+
+
+def test_flush_last_write_wins():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.put(1, 2, "A", 5)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [mock.call(1, 2, "A", 5)]
+
+
+def test_flush_write_and_erase_same_frame():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.put(1, 2, " ", 0)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_count == 0
+
+
+def test_clear():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.flush(screen)
+    frame_buffer.put(0, 0, "A", 5)
+    frame_buffer.clear("x")
+    assert frame_buffer.glyphs == ["x"] * 12
+    assert frame_buffer.front_glyphs == ["x"] * 12
+    assert frame_buffer.front_attrs == [0] * 12
+    assert frame_buffer.dirty == []
+
+
+def test_flush_row_major_order():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(2, 1, "A", 0)
+    frame_buffer.put(0, 3, "B", 5)
+    frame_buffer.put(1, 0, "C", 6)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(0, 3, "B", 5), mock.call(1, 0, "C", 6),
+        mock.call(2, 1, "A", 0),
+    ]
+
+
+def test_flush_batches_same_attr_span():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 6)
+    frame_buffer.put(1, 3, "C", 5)
+    frame_buffer.put(1, 1, "A", 5)
+    frame_buffer.put(1, 2, "B", 5)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [mock.call(1, 1, "ABC", 5)]
+    assert frame_buffer.cells_written == 3
+    assert frame_buffer.spans_written == 1
+
+
+def test_flush_splits_span_on_attr_change():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 6)
+    frame_buffer.put(1, 1, "A", 5)
+    frame_buffer.put(1, 2, "B", 6)
+    frame_buffer.put(1, 3, "C", 6)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(1, 1, "A", 5), mock.call(1, 2, "BC", 6)
+    ]
+
+
+def test_flush_does_not_span_rows():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(0, 3, "A", 5)
+    frame_buffer.put(1, 0, "B", 5)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(0, 3, "A", 5), mock.call(1, 0, "B", 5)
+    ]
+
+
+def test_flush_bridges_one_cell_gap_same_attr():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 6)
+    frame_buffer.put(1, 2, "X", 5)
+    frame_buffer.flush(screen)
+    screen.reset_mock()
+    frame_buffer.put(1, 1, "A", 5)
+    frame_buffer.put(1, 3, "B", 5)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [mock.call(1, 1, "AXB", 5)]
+    assert frame_buffer.cells_written == 2
+
+
+def test_flush_no_bridge_different_attr():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 6)
+    frame_buffer.put(1, 1, "A", 5)
+    frame_buffer.put(1, 3, "B", 5)
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(1, 1, "A", 5), mock.call(1, 3, "B", 5)
+    ]
+
+
+def test_compact_keeps_each_cell_once():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(2, 2)
+    for _ in range(3):
+        frame_buffer.put(0, 1, "A", 5)
+        frame_buffer.put(1, 0, "B", 5)
+    frame_buffer.compact()
+    assert sorted(frame_buffer.dirty) == [1, 2]
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(0, 1, "A", 5), mock.call(1, 0, "B", 5)
+    ]
+
+
+def test_compact_leaves_short_list():
+    frame_buffer = pymatrix.FrameBuffer(2, 2)
+    frame_buffer.put(0, 1, "A")
+    frame_buffer.put(0, 1, "B")
+    frame_buffer.compact()
+    assert frame_buffer.dirty == [1, 1]
+
+
+def test_invalidate_resends_drawn_cells():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 2, "T", 5)
+    frame_buffer.put(2, 0, "A", 0)
+    frame_buffer.flush(screen)
+    screen.reset_mock()
+    frame_buffer.invalidate()
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [
+        mock.call(1, 2, "T", 5), mock.call(2, 0, "A", 0)
+    ]
+
+
+def test_invalidate_bg_char():
+    screen = mock.Mock()
+    frame_buffer = pymatrix.FrameBuffer(3, 4, "x")
+    frame_buffer.put(0, 0, " ", 0)
+    frame_buffer.flush(screen)
+    screen.reset_mock()
+    frame_buffer.invalidate("x")
+    frame_buffer.flush(screen)
+    assert screen.addstr.call_args_list == [mock.call(0, 0, " ", 0)]
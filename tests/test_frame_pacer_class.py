@@ -0,0 +1,85 @@
+from pymatrix import pymatrix
+from tests.conftest import build_matrix
+
+
+def test_init():
+    pacer = pymatrix.FramePacer()
+    assert pacer.deadline is None
+    assert pacer.dropped == 0
+
+
+def test_wait_full_period_first_frame(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.wait(0.05)
+    assert clock.sleeps == [0.05]
+
+
+def test_wait_subtracts_work_time(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.wait(0.05)
+    clock.now += 0.02  # frame work
+    pacer.wait(0.05)
+    assert clock.sleeps == [0.05, 0.03]
+
+
+def test_wait_late_frame_no_sleep(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.wait(0.05)
+    clock.now += 0.07
+    pacer.wait(0.05)
+    assert clock.sleeps == [0.05]
+    assert pacer.dropped == 0
+
+
+def test_wait_catches_up_after_late_frame(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.wait(0.05)
+    clock.now += 0.07
+    pacer.wait(0.05)
+    clock.now += 0.01
+    pacer.wait(0.05)
+    assert clock.sleeps == [0.05, 0.02]
+
+
+def test_wait_drops_frames_when_too_far_behind(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.wait(0.05)
+    clock.now += 1.0
+    pacer.wait(0.05)
+    assert pacer.dropped == 19
+    assert pacer.deadline == clock.now
+    pacer.wait(0.05)
+    assert clock.sleeps == [0.05, 0.05]
+
+
+def test_wait_period_change(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.wait(0.05)
+    pacer.wait(0.1)
+    assert clock.sleeps == [0.05, 0.1]
+
+
+def test_next_deadline(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    assert pacer.next_deadline(0.05) == 100.05
+    clock.now += 0.02
+    assert pacer.next_deadline(0.05) == 100.1
+    assert clock.sleeps == []
+
+
+def test_next_deadline_drops_frames_when_too_far_behind(clock):
+    pacer = pymatrix.FramePacer(clock, clock.sleep)
+    pacer.next_deadline(0.05)
+    clock.now += 1.0
+    assert pacer.next_deadline(0.05) == clock.now
+    assert pacer.dropped == 18
+
+
+def test_matrix_frame_period_delay():
+    matrix = build_matrix(["-d9"])
+    assert matrix.frame_period() == pymatrix.DELAY_SPEED[9]
+
+
+def test_matrix_frame_period_fps():
+    matrix = build_matrix(["-d9", "--fps", "50"])
+    assert matrix.frame_period() == 0.02
@@ -0,0 +1,77 @@
+import pytest
+from unittest import mock
+
+from pymatrix import pymatrix
+from tests.conftest import run_matrix
+
+
+def test_init():
+    stats = pymatrix.FrameStats()
+    assert stats.frame_times == []
+    assert stats.cells == 0
+    assert stats.spans == 0
+
+
+def test_record():
+    stats = pymatrix.FrameStats()
+    stats.record(0.5, 10, 4)
+    stats.record(0.25, 6, 2)
+    assert stats.frame_times == [0.5, 0.25]
+    assert stats.cells == 16
+    assert stats.spans == 6
+
+
+def test_percentile_empty():
+    stats = pymatrix.FrameStats()
+    assert stats.percentile(50) == 0.0
+
+
+@pytest.mark.parametrize("percent, expected", [
+    (50, 50), (95, 95), (99, 99), (100, 100), (1, 1),
+])
+def test_percentile(percent, expected):
+    stats = pymatrix.FrameStats()
+    for value in range(100, 0, -1):
+        stats.record(value, 0, 0)
+    assert stats.percentile(percent) == expected
+
+
+def test_percentile_values():
+    stats = pymatrix.FrameStats()
+    stats.record(1.0, 0, 0)
+    assert stats.percentile(50, [0.3, 0.1, 0.2]) == 0.2
+
+
+def test_latency_report():
+    stats = pymatrix.FrameStats()
+    stats.key_latencies = [0.004, 0.002]
+    report = stats.latency_report()
+    assert "key presses shown: 2" in report
+    assert "key to screen p50: 2.000 ms" in report
+    assert "key to screen p95: 4.000 ms" in report
+
+
+def test_report():
+    stats = pymatrix.FrameStats()
+    stats.record(0.002, 10, 4)
+    stats.record(0.002, 30, 6)
+    report = stats.report()
+    assert "frames: 2" in report
+    assert "frames per second: 500.0" in report
+    assert "cells written per frame: 20.0" in report
+    assert "writes per frame: 5.0" in report
+    assert "frame time p50: 2.000 ms" in report
+
+
+def test_matrix_benchmark_frames():
+    matrix = run_matrix(["--benchmark", "25", "--test_mode"],
+                        pymatrix.NullRenderer(30, 100))
+    assert len(matrix.stats.frame_times) == 25
+    assert matrix.stats.cells > 0
+
+
+def test_matrix_benchmark_does_not_sleep():
+    with mock.patch.object(pymatrix.time, "sleep") as mock_sleep:
+        run_matrix(["--benchmark", "10", "-d9"],
+                   pymatrix.NullRenderer(30, 100))
+        assert mock_sleep.call_count == 0
@@ -0,0 +1,145 @@
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+
+
+@pytest.fixture
+def pipe_reader():
+    read_fd, write_fd = os.pipe()
+    reader = pymatrix.KeyReader(read_fd, clock=lambda: 5.0)
+    yield reader, write_fd
+    reader.stop()
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def wait_for_presses(reader, count):
+    for _ in range(200):
+        if len(reader.presses) >= count:
+            return
+        time.sleep(0.005)
+
+
+def test_feed_plain_keys(pipe_reader):
+    reader, _ = pipe_reader
+    reader.feed(b"qa", 1.0)
+    assert list(reader.presses) == [pymatrix.KeyPress(113, 1.0),
+                                    pymatrix.KeyPress(97, 1.0)]
+
+
+@pytest.mark.parametrize("sequence, expected", [
+    (b"\033[A", 259), (b"\033[B", 258), (b"\033[C", 261), (b"\033[D", 260),
+    (b"\033OA", 259), (b"\033[Z", 27),
+])
+def test_feed_escape_sequences(pipe_reader, sequence, expected):
+    reader, _ = pipe_reader
+    reader.feed(sequence, 1.0)
+    assert reader.getch() == expected
+    assert reader.getch() == -1
+
+
+def test_feed_escape_split_across_reads(pipe_reader):
+    reader, _ = pipe_reader
+    reader.feed(b"\033", 1.0)
+    assert reader.getch() == -1
+    reader.feed(b"[C", 2.0)
+    assert list(reader.presses) == [pymatrix.KeyPress(261, 2.0)]
+
+
+def test_get_presses_drains_queue(pipe_reader):
+    reader, _ = pipe_reader
+    reader.feed(b"abc", 1.0)
+    assert [press.key for press in reader.get_presses()] == [97, 98, 99]
+    assert reader.get_presses() == []
+
+
+def test_getch_empty(pipe_reader):
+    reader, _ = pipe_reader
+    assert reader.getch() == -1
+
+
+def test_thread_reads_keys(pipe_reader):
+    reader, write_fd = pipe_reader
+    reader.start()
+    os.write(write_fd, b"z\033[A")
+    wait_for_presses(reader, 2)
+    assert reader.get_presses() == [pymatrix.KeyPress(122, 5.0),
+                                    pymatrix.KeyPress(259, 5.0)]
+
+
+def test_thread_lone_escape(pipe_reader):
+    reader, write_fd = pipe_reader
+    reader.start()
+    os.write(write_fd, b"\033")
+    wait_for_presses(reader, 1)
+    assert reader.getch() == 27
+
+
+def test_stop_joins_thread(pipe_reader):
+    reader, _ = pipe_reader
+    reader.start()
+    reader.stop()
+    assert not reader.thread.is_alive()
+
+
+class PipeRenderer(pymatrix.NullRenderer):
+    """ Headless screen whose keys come through a pipe. """
+    def __init__(self):
+        super().__init__(20, 60)
+        self.read_fd, self.write_fd = os.pipe()
+
+    def fileno(self):
+        return self.read_fd
+
+    def getch(self):
+        raise AssertionError("keys must come from the reader thread")
+
+
+def test_matrix_takes_keys_from_reader():
+    screen = PipeRenderer()
+    os.write(screen.write_fd, b"0")
+    args = pymatrix.argument_parsing(["--key_thread", "--fps", "200",
+                                      "-R", "1"])
+    try:
+        with mock.patch.object(pymatrix.OldScrollingLine,
+                               "old_scroll_chr_list", []):
+            matrix = pymatrix.Matrix(screen, args)
+    finally:
+        os.close(screen.read_fd)
+        os.close(screen.write_fd)
+    assert matrix.args.delay == 0
+    assert len(matrix.stats.key_latencies) == 1
+    assert matrix.key_reader.thread.is_alive() is False
+
+
+def test_wait_key_sleeps_until_key(pipe_reader):
+    reader, write_fd = pipe_reader
+    reader.start()
+    os.write(write_fd, b"f")
+    assert reader.wait_key() == 102
+
+
+def test_wait_key_thread_not_running(pipe_reader):
+    reader, _ = pipe_reader
+    assert reader.wait_key() == -1
+
+
+def test_wait_key_woken(pipe_reader):
+    reader, write_fd = pipe_reader
+    reader.stop()
+    wake_read, wake_write = os.pipe()
+    reader = pymatrix.KeyReader(reader.fd, wake_fd=wake_read)
+    try:
+        reader.start()
+        os.write(wake_write, b"x")
+        assert reader.wait_key() == pymatrix.KEY_WOKEN
+        os.write(write_fd, b"f")
+        assert reader.wait_key() == 102
+    finally:
+        reader.stop()
+        os.close(wake_read)
+        os.close(wake_write)
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from pymatrix import pymatrix
+
+
+def test_init():
+    pool = pymatrix.LinePool()
+    assert pool.free_lines == []
+    assert pool.free_old_lines == []
+    assert pool.hits == 0
+    assert pool.misses == 0
+
+
+def test_single_line_miss():
+    pool = pymatrix.LinePool()
+    line = pool.single_line(0, 5, 20, 10, "down")
+    assert isinstance(line, pymatrix.SingleLine)
+    assert line.x == 5
+    assert pool.misses == 1
+    assert pool.hits == 0
+
+
+def test_single_line_reuses_released_line():
+    pool = pymatrix.LinePool()
+    line = pool.single_line(0, 5, 20, 10, "down")
+    line.lead_y = 8
+    line.last_y = 9
+    pool.release([line])
+    with mock.patch.object(pymatrix.random, "randint", return_value=4):
+        reused = pool.single_line(3, 0, 20, 10, "left")
+    assert reused is line
+    assert reused.direction == "left"
+    assert reused.y == 3
+    assert reused.lead_x == 18
+    assert reused.last_x == 22
+    assert reused.async_scroll_count == 0
+    assert pool.hits == 1
+    assert pool.free_lines == []
+
+
+def test_old_scrolling_line_reuses_released_line():
+    pool = pymatrix.LinePool()
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", ["A"]):
+        line = pool.old_scrolling_line(5, 20, 10)
+        for _ in range(4):
+            line.advance()
+        pool.release([line])
+        reused = pool.old_scrolling_line(7, 20, 10)
+    assert reused is line
+    assert reused.x == 7
+    assert reused.y == -1
+    assert reused.lead_y == 0
+    assert list(reused.trail) == []
+    assert reused.top == 0
+    assert pool.hits == 1
+    assert pool.misses == 1
+
+
+def test_release_sorts_by_kind():
+    pool = pymatrix.LinePool()
+    line = pymatrix.SingleLine(0, 5, 20, 10, "down")
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", ["A"]):
+        old_line = pymatrix.OldScrollingLine(5, 20, 10)
+    pool.release([line, old_line])
+    assert pool.free_lines == [line]
+    assert pool.free_old_lines == [old_line]
+
+
+def test_release_max_free():
+    pool = pymatrix.LinePool()
+    lines = [pymatrix.SingleLine(0, x, 20, 10, "down") for x in range(5)]
+    with mock.patch.object(pymatrix.LinePool, "MAX_FREE", 3):
+        pool.release(lines)
+    assert pool.free_lines == lines[:3]
+
+
+def test_report():
+    pool = pymatrix.LinePool()
+    pool.hits = 7
+    pool.misses = 2
+    assert pool.report() == "line pool hits: 7\nline pool misses: 2"
+
+
+def test_matrix_reuses_lines():
+    args = pymatrix.argument_parsing(["--benchmark", "200"])
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.NullRenderer(), args)
+    assert matrix.line_pool.hits > 0
+    assert matrix.line_pool.misses < 200
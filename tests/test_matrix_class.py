@@ -0,0 +1,292 @@
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import build_matrix
+
+
+def finishing_line(x):
+    line = pymatrix.SingleLine(0, x, 80, 24, "down")
+    line.lead_y = 24
+    line.y = 24
+    line.last_y = line.height
+    return line
+
+
+def test_retire_lines_keeps_order():
+    matrix = build_matrix()
+    lines = [pymatrix.SingleLine(0, x, 80, 24, "down") for x in range(6)]
+    matrix.line_list = list(lines)
+    matrix.retire_lines([lines[4], lines[0], lines[2]])
+    assert matrix.line_list == [lines[1], lines[3], lines[5]]
+
+
+def test_retire_lines_all():
+    matrix = build_matrix()
+    lines = [pymatrix.SingleLine(0, x, 80, 24, "down") for x in range(3)]
+    matrix.line_list = list(lines)
+    matrix.retire_lines(lines)
+    assert matrix.line_list == []
+
+
+def test_display_normal_scrolling_retires_finished_lines():
+    matrix = build_matrix()
+    running = pymatrix.SingleLine(0, 1, 80, 24, "down")
+    finished = [finishing_line(x) for x in range(2, 6)]
+    matrix.line_list = [finished[0], running] + finished[1:]
+    matrix.display_normal_scrolling()
+    assert matrix.line_list == [running]
+
+
+def test_display_old_scrolling_retires_finished_lines():
+    matrix = build_matrix(["-o"])
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", ["A"]):
+        running = pymatrix.OldScrollingLine(1, 80, 24)
+        finished = pymatrix.OldScrollingLine(2, 80, 24)
+        matrix.line_list = [finished, running]
+        with mock.patch.object(pymatrix.OldScrollingLine, "okay_to_delete",
+                               autospec=True,
+                               side_effect=lambda line: line is finished):
+            matrix.display_old_scrolling()
+    assert matrix.line_list == [running]
+
+
+@pytest.mark.parametrize("keys, expected", [
+    ([], []),
+    ([49, 50, 51], [51]),
+    ([261, 260, 261, 258], [258]),
+    ([49, 97, 50], [49, 97, 50]),
+    ([98, 98, 98], [98]),
+    ([114, 114, 116], [114, 116]),
+    ([97, 97], [97, 97]),
+    ([118, 118, 118], [118, 118, 118]),
+    ([33, 64, 49], [64, 49]),
+])
+def test_coalesce_keys(keys, expected):
+    assert pymatrix.coalesce_keys(keys) == expected
+
+
+def press_keys(matrix, keys):
+    matrix.screen.getch = mock.Mock(side_effect=list(keys) + [-1])
+
+
+def test_handle_input_drains_all_keys():
+    matrix = build_matrix()
+    press_keys(matrix, [49, 98, 97])
+    assert matrix.handle_input() is False
+    assert matrix.args.delay == 1
+    assert matrix.args.bold_on is True
+    assert matrix.args.async_scroll is True
+    assert matrix.screen.getch.call_count == 4
+
+
+def test_handle_input_no_keys():
+    matrix = build_matrix()
+    press_keys(matrix, [])
+    assert matrix.handle_input() is False
+
+
+def test_handle_input_arrow_burst_clears_once():
+    matrix = build_matrix()
+    press_keys(matrix, [261, 260, 261, 260])
+    with mock.patch.object(pymatrix.time, "sleep") as m_sleep:
+        with mock.patch.object(matrix, "clear_screen") as m_clear:
+            matrix.handle_input()
+    assert matrix.dir == "left"
+    assert m_clear.call_count == 1
+    assert m_sleep.call_count == 1
+
+
+def test_handle_input_quit_in_burst():
+    matrix = build_matrix()
+    press_keys(matrix, [49, 113, 50])
+    assert matrix.handle_input() is True
+
+
+def test_handle_input_disable_keys_mid_burst():
+    matrix = build_matrix()
+    press_keys(matrix, [49, 4, 50])
+    matrix.handle_input()
+    assert matrix.args.disable_keys is True
+    assert matrix.args.delay == 1
+
+
+def test_handle_input_freeze_reads_rest_of_burst():
+    matrix = build_matrix()
+    press_keys(matrix, [102, 97, 102, 49])
+    assert matrix.handle_input() is False
+    assert matrix.args.async_scroll is False
+    assert matrix.args.delay == 1
+
+
+def test_handle_input_key_limit():
+    matrix = build_matrix()
+    matrix.screen.getch = mock.Mock(return_value=98)
+    matrix.handle_input()
+    assert matrix.screen.getch.call_count == pymatrix.MAX_KEYS_PER_FRAME
+
+
+def test_freeze_waits_for_keys():
+    matrix = build_matrix()
+    press_keys(matrix, [102])
+    matrix.screen.wait_key = mock.Mock(side_effect=[97, 98, 102])
+    assert matrix.handle_input() is False
+    assert matrix.screen.wait_key.call_count == 3
+    assert matrix.args.async_scroll is False
+
+
+def test_freeze_quit():
+    matrix = build_matrix()
+    press_keys(matrix, [102])
+    matrix.screen.wait_key = mock.Mock(side_effect=[97, 113])
+    assert matrix.handle_input() is True
+
+
+def test_freeze_without_input_returns():
+    matrix = build_matrix()
+    press_keys(matrix, [102])
+    assert matrix.handle_input() is False
+
+
+def test_no_signal_handlers_without_terminal():
+    matrix = build_matrix()
+    with mock.patch.object(pymatrix.signal, "signal") as m_signal:
+        matrix.install_signal_handlers()
+    assert m_signal.call_count == 0
+
+
+def test_install_and_restore_signal_handlers():
+    matrix = build_matrix()
+    matrix.screen.fileno = mock.Mock(return_value=0)
+    with mock.patch.object(pymatrix.os, "isatty", return_value=True):
+        with mock.patch.object(pymatrix.signal, "signal",
+                               return_value="old") as m_signal:
+            matrix.install_signal_handlers()
+            matrix.restore_signal_handlers()
+    assert m_signal.call_args_list == [
+        mock.call(pymatrix.signal.SIGTSTP, matrix.handle_suspend),
+        mock.call(pymatrix.signal.SIGCONT, matrix.handle_continue),
+        mock.call(pymatrix.signal.SIGTSTP, "old"),
+        mock.call(pymatrix.signal.SIGCONT, "old"),
+    ]
+
+
+def test_handle_suspend_stops_process():
+    matrix = build_matrix()
+    matrix.screen.suspend = mock.Mock()
+    with mock.patch.object(pymatrix.signal, "pthread_kill") as m_kill:
+        with mock.patch.object(pymatrix.signal, "signal") as m_signal:
+            matrix.handle_suspend(pymatrix.signal.SIGTSTP, None)
+    assert matrix.suspended is True
+    assert matrix.screen.suspend.call_count == 1
+    m_kill.assert_called_once_with(pymatrix.threading.get_ident(),
+                                   pymatrix.signal.SIGTSTP)
+    assert m_signal.call_args_list == [
+        mock.call(pymatrix.signal.SIGTSTP, pymatrix.signal.SIG_DFL),
+        mock.call(pymatrix.signal.SIGTSTP, matrix.handle_suspend),
+    ]
+
+
+def test_handle_continue_in_background_stops_again():
+    matrix = build_matrix()
+    matrix.suspended = True
+    matrix.screen.resume = mock.Mock()
+    with mock.patch.object(matrix, "in_foreground", return_value=False):
+        with mock.patch.object(pymatrix.os, "kill") as m_kill:
+            matrix.handle_continue(pymatrix.signal.SIGCONT, None)
+    assert m_kill.call_count == 1
+    assert matrix.resumed is False
+    assert matrix.suspended is True
+
+
+def test_handle_continue_only_flags_resume():
+    matrix = build_matrix()
+    matrix.suspended = True
+    matrix.screen.resume = mock.Mock()
+    matrix.wake_read, matrix.wake_write = pymatrix.os.pipe()
+    try:
+        with mock.patch.object(matrix, "in_foreground", return_value=True):
+            matrix.handle_continue(pymatrix.signal.SIGCONT, None)
+            matrix.handle_continue(pymatrix.signal.SIGCONT, None)
+        assert pymatrix.os.read(matrix.wake_read, 64) == b"xx"
+    finally:
+        matrix.restore_signal_handlers()
+    assert matrix.resumed is True
+    assert matrix.suspended is True
+    assert matrix.screen.resume.call_count == 0
+
+
+def test_resume_screen_redraws():
+    matrix = build_matrix()
+    matrix.frame_buffer.put(1, 1, "T", 5)
+    matrix.frame_buffer.flush(matrix.screen)
+    matrix.suspended = True
+    matrix.resumed = True
+    matrix.screen.resume = mock.Mock()
+    matrix.screen.addstr = mock.Mock()
+    assert matrix.resume_screen() is True
+    assert matrix.suspended is False
+    assert matrix.resumed is False
+    assert matrix.screen.resume.call_count == 1
+    matrix.screen.addstr.assert_called_once_with(1, 1, "T", 5)
+    assert matrix.resume_screen() is False
+
+
+def test_tick_resumes_before_frame():
+    matrix = build_matrix(["--benchmark", "5"])
+    matrix.suspended = True
+    matrix.resumed = True
+    matrix.screen.resume = mock.Mock()
+    matrix.tick()
+    assert matrix.screen.resume.call_count == 1
+    assert matrix.frame_buffer.cells_written > 0
+
+
+def test_frame_not_sent_while_suspended():
+    matrix = build_matrix()
+    matrix.suspended = True
+    with mock.patch.object(matrix.frame_buffer, "flush") as m_flush:
+        matrix.draw_frame(0.0)
+    assert m_flush.call_count == 0
+    assert matrix.frame_buffer.dirty != []
+
+
+def test_freeze_resumes_and_keeps_waiting():
+    matrix = build_matrix()
+    matrix.suspended = True
+    matrix.resumed = True
+    matrix.screen.resume = mock.Mock()
+    matrix.screen.wait_key = mock.Mock(side_effect=[pymatrix.KEY_WOKEN, 102])
+    assert matrix.handle_key(102) is None
+    assert matrix.screen.wait_key.call_count == 2
+    assert matrix.screen.resume.call_count == 1
+
+
+def test_frame_not_sent_while_output_busy():
+    matrix = build_matrix()
+    matrix.screen.output_busy = mock.Mock(return_value=True)
+    with mock.patch.object(matrix.frame_buffer, "flush") as m_flush:
+        matrix.draw_frame(0.0)
+    assert m_flush.call_count == 0
+    assert matrix.stats.frames_not_sent == 1
+
+
+@pytest.mark.parametrize("engine", ["lines", "arrays"])
+def test_changes_bounded_while_output_busy(engine):
+    matrix = build_matrix(["--engine", engine],
+                          pymatrix.NullRenderer(90, 300))
+    matrix.screen.output_busy = mock.Mock(return_value=True)
+    for _ in range(300):
+        matrix.draw_frame(0.0)
+        assert len(matrix.frame_buffer.dirty) <= 300 * 90
+    assert matrix.stats.frames_not_sent == 300
+
+
+def test_frame_sent_when_output_free():
+    matrix = build_matrix()
+    with mock.patch.object(matrix.frame_buffer, "flush") as m_flush:
+        matrix.draw_frame(0.0)
+    assert m_flush.call_count == 1
+    assert matrix.stats.frames_not_sent == 0
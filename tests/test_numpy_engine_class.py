@@ -0,0 +1,142 @@
+import random
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import build_state
+from tests.conftest import draw
+
+pytest.importorskip("numpy")
+
+
+def test_add_is_pending_until_draw():
+    engine = pymatrix.NumpyEngine("down", 20, 10)
+    engine.add(0, 4)
+    engine.add(0, 6)
+    assert len(engine) == 2
+    assert len(engine.cross) == 0
+    engine.merge_pending()
+    assert engine.cross.tolist() == [4, 6]
+    assert engine.pending == []
+    assert len(engine) == 2
+
+
+@pytest.mark.parametrize("direction, expected", [
+    ("down", [4, 0, -1, -5]), ("up", [4, 8, 9, 12]),
+    ("right", [2, 0, -1, -5]), ("left", [2, 18, 19, 23]),
+])
+def test_add(direction, expected):
+    engine = pymatrix.NumpyEngine(direction, 20, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[3, 6, 5]):
+        engine.add(2, 4)
+    engine.merge_pending()
+    assert [engine.cross[0], engine.lead[0], engine.head[0],
+            engine.tail[0]] == expected
+    assert engine.async_rate[0] == 3
+    assert engine.color[0] == 6
+
+
+def test_clear():
+    engine = pymatrix.NumpyEngine("down", 20, 10)
+    engine.add(0, 4)
+    engine.merge_pending()
+    engine.add(0, 5)
+    engine.clear("left")
+    assert len(engine) == 0
+    assert engine.direction == "left"
+
+
+def test_in_use():
+    engine = pymatrix.NumpyEngine("down", 20, 10)
+    engine.add(0, 4)
+    engine.merge_pending()
+    engine.add(0, 7)
+    assert engine.in_use() == {4, 7}
+
+
+def test_draw_down_first_frame():
+    engine = pymatrix.NumpyEngine("down", 10, 10)
+    engine.add(0, 4)
+    frame_buffer = pymatrix.FrameBuffer(10, 10)
+    draw(engine, frame_buffer)
+    assert frame_buffer.dirty == [4]
+    assert frame_buffer.glyphs[4] in ["A", "B"]
+    assert frame_buffer.attrs[4] == build_state().lead[0]
+
+
+def test_draw_returns_column_and_retires():
+    engine = pymatrix.NumpyEngine("down", 10, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[0, 1, 3]):
+        engine.add(0, 4)
+    free_columns = pymatrix.ColumnPool()
+    frame_buffer = pymatrix.FrameBuffer(10, 10)
+    for _ in range(3):
+        draw(engine, frame_buffer, free_columns)
+    assert list(free_columns) == []
+    draw(engine, frame_buffer, free_columns)
+    assert list(free_columns) == [4]
+    for _ in range(8):
+        draw(engine, frame_buffer, free_columns)
+    assert len(engine) == 0
+
+
+def test_draw_async_scroll_waits_turn():
+    engine = pymatrix.NumpyEngine("down", 10, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[2, 1, 3]):
+        engine.add(0, 4)
+    frame_buffer = pymatrix.FrameBuffer(10, 10)
+    draw(engine, frame_buffer, async_scroll=True)
+    draw(engine, frame_buffer, async_scroll=True)
+    assert frame_buffer.dirty == []
+    draw(engine, frame_buffer, async_scroll=True)
+    assert frame_buffer.dirty == [4]
+
+
+def draw_single_lines(lines, width, dirty):
+    """ Move SingleLine objects the way Matrix does, noting the cells. """
+    for line in list(lines):
+        for cell in [line.delete_last(), line.get_next(), line.get_lead()]:
+            if cell:
+                dirty.append(cell[0] * width + cell[1])
+        if line.okay_to_delete():
+            lines.remove(line)
+
+
+@pytest.mark.parametrize("direction", ["down", "up", "right", "left"])
+def test_draw_same_cells_as_single_lines(direction):
+    random.seed(3)
+    engine = pymatrix.NumpyEngine(direction, 30, 12)
+    lines = []
+    numpy_buffer = pymatrix.FrameBuffer(12, 30)
+    for frame in range(40):
+        if frame % 3 == 0:
+            y, x = frame % 10 + 1, frame % 25
+            state = random.getstate()
+            engine.add(y, x)
+            random.setstate(state)
+            lines.append(pymatrix.SingleLine(y, x, 30, 12, direction))
+        draw(engine, numpy_buffer)
+        line_dirty = []
+        draw_single_lines(lines, 30, line_dirty)
+        assert sorted(numpy_buffer.dirty) == sorted(line_dirty)
+        assert len(engine) == len(lines)
+        numpy_buffer.dirty.clear()
+
+
+@pytest.mark.parametrize("test_args", [
+    [], ["--reverse"], ["--scroll_right"], ["--scroll_left"], ["-a"],
+    ["-M", "-b"], ["-m", "-B"], ["-W"],
+])
+def test_matrix_numpy_engine(test_args):
+    args = pymatrix.argument_parsing(["--benchmark", "60", "--engine",
+                                      "numpy"] + test_args)
+    screen = pymatrix.RecordingRenderer(20, 50)
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(screen, args)
+    assert isinstance(matrix.streams, pymatrix.NumpyEngine)
+    assert matrix.stats.cells > 0
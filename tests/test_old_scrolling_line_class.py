@@ -251,3 +251,39 @@ def test_full_line_run():
             assert loc_list == []
             okay_to_delete = test_line.okay_to_delete()
             assert okay_to_delete is True
+
+
+def test_advance_keeps_glyphs_in_ring():
+    with mock.patch.object(pymatrix.random, "choice",
+                           side_effect=["L", "A", "B", "C"]):
+        with mock.patch.object(pymatrix.random, "randint", return_value=3):
+            test_line = pymatrix.OldScrollingLine(5, 10, 6)
+            for x in range(4):
+                test_line.advance()
+            assert list(test_line.trail) == ["A", "B", "C"]
+            assert test_line.top == 0
+            test_line.advance()
+            assert list(test_line.trail) == ["A", "B", "C"]
+            assert test_line.top == 1
+
+
+def test_advance_drops_oldest_off_screen():
+    with mock.patch.object(pymatrix.random, "choice",
+                           side_effect=["L", "A", "B", "C"]):
+        with mock.patch.object(pymatrix.random, "randint", return_value=3):
+            test_line = pymatrix.OldScrollingLine(5, 10, 6)
+            for x in range(7):
+                test_line.advance()
+            assert list(test_line.trail) == ["B", "C"]
+            assert test_line.top == 3
+            assert test_line.location_list == [[4, 5, "B"], [3, 5, "C"]]
+
+
+def test_location_list_setter():
+    with mock.patch.object(pymatrix.random, "choice", return_value="X"):
+        with mock.patch.object(pymatrix.random, "randint", return_value=3):
+            test_line = pymatrix.OldScrollingLine(5, 10, 6)
+            test_line.location_list = [[3, 5, "A"], [2, 5, "B"]]
+            assert list(test_line.trail) == ["A", "B"]
+            assert test_line.top == 2
+            assert test_line.delete_last() is None
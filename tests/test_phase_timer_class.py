@@ -0,0 +1,78 @@
+from unittest import mock
+
+from pymatrix import pymatrix
+
+
+def test_init():
+    timer = pymatrix.PhaseTimer()
+    assert list(timer.totals) == pymatrix.PhaseTimer.PHASES
+    assert all(total == 0.0 for total in timer.totals.values())
+    assert all(count == 0 for count in timer.counts.values())
+
+
+def test_lap_charges_time_since_mark(clock):
+    timer = pymatrix.PhaseTimer(clock)
+    timer.start()
+    clock.now += 0.25
+    timer.lap("display")
+    clock.now += 0.5
+    timer.lap("refresh")
+    assert timer.totals["display"] == 0.25
+    assert timer.totals["refresh"] == 0.5
+    assert timer.counts["display"] == 1
+    assert timer.counts["refresh"] == 1
+
+
+def test_lap_adds_up(clock):
+    timer = pymatrix.PhaseTimer(clock)
+    for _ in range(3):
+        timer.start()
+        clock.now += 0.5
+        timer.lap("input")
+    assert timer.totals["input"] == 1.5
+    assert timer.counts["input"] == 3
+
+
+def test_report(clock):
+    timer = pymatrix.PhaseTimer(clock)
+    timer.start()
+    clock.now += 0.75
+    timer.lap("display")
+    clock.now += 0.25
+    timer.lap("refresh")
+    report = timer.report().split("\n")
+    assert report[0].split() == ["phase", "total", "ms", "calls",
+                                 "mean", "us", "share"]
+    assert len(report) == len(pymatrix.PhaseTimer.PHASES) + 1
+    assert report[4].split() == ["display", "750.000", "1",
+                                 "750000.0", "75.0%"]
+    assert report[5].split() == ["refresh", "250.000", "1",
+                                 "250000.0", "25.0%"]
+    assert report[1].split() == ["resize", "0.000", "0", "0.0", "0.0%"]
+
+
+def test_report_empty():
+    report = pymatrix.PhaseTimer().report()
+    assert "0.0%" in report
+
+
+def test_main_loop_times_every_phase():
+    args = pymatrix.argument_parsing(["--benchmark", "5"])
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.NullRenderer(), args)
+    assert all(count == 5 for count in matrix.phases.counts.values())
+    assert matrix.phases.counts["display"] == 5
+    assert matrix.phases.counts["refresh"] == 5
+    assert matrix.phases.counts["input"] == 5
+
+
+def test_main_profile(tmp_path, capsys):
+    profile_file = tmp_path / "pymatrix.prof"
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        pymatrix.main(["--benchmark", "5", "--profile", str(profile_file)])
+    captured = capsys.readouterr().out
+    assert "display" in captured
+    assert "refresh" in captured
+    assert profile_file.exists()
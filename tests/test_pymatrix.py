@@ -513,52 +513,42 @@ def test_pymatrix_wakeup_now_keys_katakana_only():
         h.await_text("T")
 
 
-def test_pymatrix_wakeup_do_not_quit_on_q():
-    # this is a long test
+@pytest.mark.parametrize("test_key", ["Q", "q"])
+def test_pymatrix_wakeup_quit_on_q(test_key):
     with Runner(*pymatrix_run("--test_mode", "--wakeup")) as h:
         h.await_text("T")
         h.default_timeout = 10
         h.await_text("Wake up, Neo...")
-        h.write("q")
+        h.write(test_key)
         h.press("Enter")
-        h.await_text("Knock, knock, Neo.")
-        h.await_text("T")
+        h.await_exit()
 
 
-def test_pymatrix_wakeup_ignore_multiple_key_presses():
-    # this is a long test
+def test_pymatrix_wakeup_skip_with_key():
     with Runner(*pymatrix_run("--test_mode", "--wakeup")) as h:
         h.await_text("T")
         h.default_timeout = 10
         h.await_text("Wake up, Neo...")
-        h.write("q")
-        h.await_text("The Matrix has you...")
-        h.write("q")
-        h.await_text("Knock, knock, Neo.")
+        h.write("x")
         h.await_text("T")
+        assert "Wake up, Neo..." not in h.screenshot()
+        assert "The Matrix has you..." not in h.screenshot()
 
 
-def test_pymatrix_wakeup_ignore_alot_of_key_presses():
-    # this is a long test
+def test_pymatrix_wakeup_skip_with_a_lot_of_key_presses():
     with Runner(*pymatrix_run("--test_mode", "--wakeup")) as h:
         h.await_text("T")
         h.default_timeout = 10
         h.await_text("Wake up, Neo...")
-        h.write("q")
-        h.await_text("The Matrix has you...")
-        h.write("q")
-        h.await_text("Follow the white rabbit.")
-        h.write("q")
-        h.write("q")
-        h.write("q")
-        h.write("q")
-        h.write("q")
-        h.await_text("Knock, knock, Neo.")
+        h.write("x")
+        h.write("x")
+        h.write("x")
+        h.press("Left")
         h.await_text("T")
+        assert "Wake up, Neo..." not in h.screenshot()
 
 
-def test_pymatrix_wakeup_now_ignore_keys_multiple_key_presses():
-    # this is a long test
+def test_pymatrix_wakeup_now_keys_skip_with_key():
     with Runner(*pymatrix_run("--test_mode")) as h:
         h.await_text("T")
         h.default_timeout = 10
@@ -567,14 +557,9 @@ def test_pymatrix_wakeup_now_ignore_keys_multiple_key_presses():
         h.write("k")
         h.write("e")
         h.await_text("Wake up, Neo...")
-        h.write("q")
-        h.await_text("The Matrix has you...")
-        h.write("q")
-        h.await_text("Follow the white rabbit.")
-        h.write("q")
-        h.write("q")
-        h.await_text("Knock, knock, Neo.")
+        h.write("x")
         h.await_text("T")
+        assert "The Matrix has you..." not in h.screenshot()
 
 
 @pytest.mark.parametrize("width", [80, 50, 40, 30, 20, 15, 10])
@@ -1433,7 +1418,7 @@ def test_build_character_set_test_char():
         zero_one=False, test_mode=True
     )
     test_set = pymatrix.build_character_set2(args)
-    assert test_set == ["T"]
+    assert test_set == ("T",)
 
 
 def test_build_character_set_test_ext():
@@ -1442,7 +1427,7 @@ def test_build_character_set_test_ext():
         zero_one=False, test_mode=True
     )
     test_set = pymatrix.build_character_set2(args)
-    assert test_set == ["Ä", "T"]
+    assert test_set == ("Ä", "T")
 
 
 def test_build_character_set_test_katakana_only():
@@ -1451,7 +1436,7 @@ def test_build_character_set_test_katakana_only():
         zero_one=False, test_mode=True
     )
     test_set = pymatrix.build_character_set2(args)
-    assert test_set == ["ﾎ", "0"]
+    assert test_set == ("ﾎ", "0")
 
 
 def test_build_character_set_char_normal():
@@ -1488,7 +1473,7 @@ def test_build_character_set_test_ext_only():
         zero_one=False, test_mode=True
     )
     test_set = pymatrix.build_character_set2(args)
-    assert test_set == ["Ä"]
+    assert test_set == ("Ä",)
 
 
 def test_build_character_set_ext_and_char():
@@ -1548,7 +1533,7 @@ def test_build_character_set_test_katakana_and_char():
         zero_one=False, test_mode=True
     )
     test_set = pymatrix.build_character_set2(args)
-    assert test_set == ["T", "ﾎ"]
+    assert test_set == ("T", "ﾎ")
 
 
 def test_build_character_set_katakana_char_and_ext():
@@ -1574,7 +1559,35 @@ def test_build_character_set_test_katakana_char_and_ext():
         zero_one=False, test_mode=True
     )
     test_set = pymatrix.build_character_set2(args)
-    assert test_set == ["T", "ﾎ", "Ä"]
+    assert test_set == ("T", "ﾎ", "Ä")
+
+
+def test_build_character_set_same_set_reused():
+    args = pymatrix.argparse.Namespace(
+        ext=True, ext_only=False, katakana=True, Katakana_only=False,
+        zero_one=False, test_mode=False
+    )
+    test_set = pymatrix.build_character_set2(args)
+    assert isinstance(test_set, tuple)
+    assert pymatrix.build_character_set2(args) is test_set
+
+
+def test_build_character_set_caches_glyph_encoding():
+    pymatrix.encode_glyphs.cache_clear()
+    pymatrix.character_set.cache_clear()
+    pymatrix.character_set(False, False, True, False, False, False)
+    hits = pymatrix.encode_glyphs.cache_info().hits
+    assert pymatrix.encode_glyphs("ﾎ") == ("ﾎ".encode(), 1)
+    assert pymatrix.encode_glyphs.cache_info().hits == hits + 1
+
+
+@pytest.mark.parametrize("test_value, expected_result", [
+    ("T", (b"T", 1)), ("ﾎ", ("ﾎ".encode(), 1)), ("Ä", ("Ä".encode(), 1)),
+    ("あ", ("あ".encode(), 2)), ("ＡB", ("ＡB".encode(), 3)),
+    ("e\u0301", ("e\u0301".encode(), 1)),
+])
+def test_encode_glyphs(test_value, expected_result):
+    assert pymatrix.encode_glyphs(test_value) == expected_result
 
 
 def test_build_character_set_old_scrolling_update_list_test():
@@ -1583,7 +1596,7 @@ def test_build_character_set_old_scrolling_update_list_test():
         zero_one=False, test_mode=True
     )
     pymatrix.build_character_set2(args)
-    assert pymatrix.OldScrollingLine.old_scroll_chr_list == ["T"]
+    assert pymatrix.OldScrollingLine.old_scroll_chr_list == ("T",)
 
 
 def test_build_character_set_old_scrolling_update_list_normal():
@@ -1622,3 +1635,14 @@ def test_pymatrix_main_list_commands(capsys):
     assert "Commands available during run" in captured_output
     assert "Delay" in captured_output
     assert "Cycle color delay" in captured_output
+
+
+def test_pymatrix_main_benchmark(capsys):
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        pymatrix.main(["--benchmark", "20", "--size", "100x30", "--test_mode"])
+    captured_output = capsys.readouterr().out
+    assert "frames: 20" in captured_output
+    assert "frames per second" in captured_output
+    assert "cells written per frame" in captured_output
+    assert "frame time p99" in captured_output
@@ -0,0 +1,166 @@
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import build_matrix
+from tests.conftest import run_matrix
+
+
+def test_init():
+    governor = pymatrix.QualityGovernor()
+    assert governor.level == 0
+    assert governor.spawn_count == 2
+    assert governor.line_fraction == 1.0
+    assert governor.double_space is False
+    assert governor.decisions == []
+
+
+def test_backs_off_after_over_budget_frames():
+    governor = pymatrix.QualityGovernor()
+    for _ in range(4):
+        assert governor.update(0.2, 0.1) is False
+    assert governor.update(0.2, 0.1) is True
+    assert governor.level == 1
+    assert governor.spawn_count == 1
+    assert governor.decisions == [(5, 0, 1)]
+
+
+def test_single_slow_frame_does_not_back_off():
+    governor = pymatrix.QualityGovernor()
+    for _ in range(20):
+        governor.update(0.2, 0.1)
+        governor.update(0.07, 0.1)
+    assert governor.level == 0
+
+
+def test_levels_stop_at_max():
+    governor = pymatrix.QualityGovernor()
+    for _ in range(50):
+        governor.update(0.2, 0.1)
+    assert governor.level == 3
+    assert governor.line_fraction == 0.5
+    assert governor.double_space is True
+    assert len(governor.decisions) == 3
+
+
+def test_restores_after_headroom():
+    governor = pymatrix.QualityGovernor()
+    governor.set_level(2)
+    for _ in range(59):
+        assert governor.update(0.01, 0.1) is False
+    assert governor.update(0.01, 0.1) is True
+    assert governor.level == 1
+
+
+def test_near_budget_holds_level():
+    governor = pymatrix.QualityGovernor()
+    governor.set_level(1)
+    for _ in range(200):
+        governor.update(0.08, 0.1)
+    assert governor.level == 1
+
+
+def test_report():
+    governor = pymatrix.QualityGovernor()
+    for _ in range(5):
+        governor.update(0.2, 0.1)
+    assert governor.report() == ("quality level: 1\n"
+                                 "quality changes: 1\n"
+                                 "  frame 5: level 0 -> 1")
+
+
+def test_matrix_no_governor_by_default():
+    matrix = build_matrix([])
+    assert matrix.governor is None
+
+
+def test_add_lines_spawn_count():
+    matrix = build_matrix(["--adaptive"])
+    matrix.add_lines(matrix.size_y, matrix.size_x)
+    assert len(matrix.line_list) == 2
+    matrix.governor.set_level(1)
+    matrix.add_lines(matrix.size_y, matrix.size_x)
+    assert len(matrix.line_list) == 3
+
+
+def test_add_lines_line_cap():
+    matrix = build_matrix(["--adaptive"])
+    matrix.governor.set_level(2)
+    for _ in range(100):
+        matrix.add_lines(matrix.size_y, matrix.size_x)
+    assert len(matrix.line_list) == int((matrix.size_x - 1) * 0.5)
+
+
+def test_apply_governor_double_space_and_restore():
+    matrix = build_matrix(["--adaptive"])
+    matrix.governor.set_level(3)
+    matrix.apply_governor()
+    assert matrix.spacer == 2
+    assert all(x % 2 == 0 for x in matrix.free_columns)
+    matrix.governor.set_level(2)
+    matrix.apply_governor()
+    assert matrix.spacer == 1
+    assert sorted(matrix.free_columns) == list(range(matrix.size_x))
+
+
+def test_apply_governor_keeps_user_double_space():
+    matrix = build_matrix(["--adaptive", "-l"])
+    matrix.governor.set_level(3)
+    matrix.apply_governor()
+    matrix.governor.set_level(2)
+    matrix.apply_governor()
+    assert matrix.spacer == 2
+
+
+def test_apply_governor_skips_columns_in_use():
+    matrix = build_matrix(["--adaptive"])
+    matrix.governor.set_level(3)
+    matrix.apply_governor()
+    matrix.line_list.append(pymatrix.SingleLine(0, 3, matrix.size_x,
+                                                matrix.size_y, "down"))
+    matrix.governor.set_level(2)
+    matrix.apply_governor()
+    assert 3 not in matrix.free_columns
+
+
+@pytest.mark.parametrize("engine", ["lines", "arrays"])
+def test_apply_governor_double_space_outlives_running_lines(engine):
+    matrix = build_matrix(["--adaptive", "--engine", engine])
+    for _ in range(10):
+        matrix.add_lines(matrix.size_y, matrix.size_x)
+        matrix.display_normal_scrolling()
+    assert matrix.line_count() > 0
+    matrix.governor.set_level(3)
+    matrix.apply_governor()
+    for _ in range(60):
+        matrix.add_lines(matrix.size_y, matrix.size_x)
+        matrix.display_normal_scrolling()
+    assert all(x % 2 == 0 for x in matrix.free_columns)
+
+
+def test_benchmark_adaptive_report(capsys):
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        pymatrix.main(["--benchmark", "10", "--adaptive"])
+    captured = capsys.readouterr().out
+    assert "quality level: " in captured
+
+
+def test_adaptive_report_without_benchmark(capsys):
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        pymatrix.main(["--backend", "null", "-R", "1", "--adaptive"])
+    captured = capsys.readouterr().out
+    assert "quality level: " in captured
+    assert "frames per second" not in captured
+
+
+@pytest.mark.parametrize("direction", ["--scroll_right", "--scroll_left"])
+def test_adaptive_level_zero_draws_same_frames(direction):
+    test_args = ["--benchmark", "200", "--seed", "3", "--checksum",
+                 direction]
+    plain = run_matrix(test_args)
+    adaptive = run_matrix(test_args + ["--adaptive"])
+    assert adaptive.governor.decisions == []
+    assert adaptive.checksums == plain.checksums
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from pymatrix import pymatrix
+
+
+def test_next_glyph_from_char_set():
+    source = pymatrix.RandomSource(["a", "b"])
+    glyphs = {source.next_glyph() for _ in range(200)}
+    assert glyphs == {"a", "b"}
+
+
+def test_next_bold():
+    source = pymatrix.RandomSource(["a"])
+    bolds = [source.next_bold() for _ in range(3000)]
+    assert set(bolds) == {True, False}
+    assert 800 < bolds.count(True) < 1200
+
+
+def test_next_color():
+    source = pymatrix.RandomSource(["a"])
+    colors = {source.next_color() for _ in range(500)}
+    assert colors == {1, 2, 3, 4, 5, 6, 7}
+
+
+def test_block_refill():
+    with mock.patch.object(pymatrix.RandomSource, "BLOCK", 3):
+        with mock.patch.object(pymatrix.random, "choices",
+                               side_effect=[["a", "b", "c"],
+                                            ["d", "e", "f"]]) as choices:
+            source = pymatrix.RandomSource(["x"])
+            glyphs = [source.next_glyph() for _ in range(4)]
+    assert glyphs == ["a", "b", "c", "d"]
+    assert choices.call_count == 2
+    assert choices.call_args == mock.call(["x"], k=3)
+
+
+def test_no_block_made_until_used():
+    with mock.patch.object(pymatrix.random, "choices") as choices:
+        pymatrix.RandomSource(["x"])
+    assert choices.call_count == 0
+
+
+def test_set_char_set_drops_old_block():
+    source = pymatrix.RandomSource(["a"])
+    assert source.next_glyph() == "a"
+    source.set_char_set(["z"])
+    assert source.char_set == ["z"]
+    assert {source.next_glyph() for _ in range(10)} == {"z"}
+
+
+def test_matrix_char_set_refills_source():
+    args = pymatrix.argument_parsing(["-z"])
+    with mock.patch.object(pymatrix.Matrix, "main_loop"):
+        with mock.patch.object(pymatrix.OldScrollingLine,
+                               "old_scroll_chr_list", []):
+            matrix = pymatrix.Matrix(pymatrix.NullRenderer(), args)
+    assert {matrix.random_source.next_glyph() for _ in range(50)} <= {"0", "1"}
+    matrix.char_set = ["Q"]
+    assert matrix.random_source.char_set == ["Q"]
+    assert matrix.random_source.next_glyph() == "Q"
@@ -0,0 +1,55 @@
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import build_state
+
+
+def test_rebuild_colors():
+    state = build_state([])
+    assert len(state.colors) == 8
+    assert state.colors[1] == (256, 256 + pymatrix.curses.A_BOLD)
+    assert state.colors[7] == (7 * 256, 7 * 256 + pymatrix.curses.A_BOLD)
+
+
+def test_rebuild_lead():
+    state = build_state([])
+    assert state.lead == (2560, 2560 + pymatrix.curses.A_BOLD)
+
+
+def test_rebuild_italic():
+    state = build_state(["-j"])
+    italic = pymatrix.curses.A_ITALIC
+    assert state.colors[3] == (768 + italic,
+                               768 + pymatrix.curses.A_BOLD + italic)
+    assert state.lead[0] == 2560 + italic
+
+
+@pytest.mark.parametrize("test_args, bold, bold_random", [
+    ([], 0, False), (["-b"], 0, True), (["-B"], 1, False),
+    (["-b", "-B"], 1, False),
+])
+def test_rebuild_bold(test_args, bold, bold_random):
+    state = build_state(test_args)
+    assert state.bold == bold
+    assert state.bold_random == bold_random
+
+
+@pytest.mark.parametrize("color_mode, expected", [
+    ("normal", False), ("multiple", False), ("cycle", False),
+    ("random", True),
+])
+def test_rebuild_random_color(color_mode, expected):
+    state = build_state([], color_mode)
+    assert state.random_color == expected
+
+
+def test_rebuild_after_setting_change():
+    args = pymatrix.argument_parsing([])
+    state = pymatrix.RenderState(pymatrix.NullRenderer())
+    state.rebuild(args, "normal")
+    args.italic = True
+    args.bold_all = True
+    state.rebuild(args, "normal")
+    assert state.bold == 1
+    assert state.lead[1] == (2560 + pymatrix.curses.A_BOLD +
+                             pymatrix.curses.A_ITALIC)
@@ -0,0 +1,324 @@
+import os
+import pty
+import threading
+import pytest
+from unittest import mock
+
+from pymatrix import pymatrix
+
+
+def test_renderer_needs_getmaxyx_and_addstr():
+    class NoSizeRenderer(pymatrix.Renderer):
+        def addstr(self, y, x, text, attr=0):
+            pass
+
+    with pytest.raises(TypeError):
+        NoSizeRenderer()
+    with pytest.raises(TypeError):
+        pymatrix.Renderer()
+
+
+def test_null_renderer_size():
+    renderer = pymatrix.NullRenderer(30, 100)
+    assert renderer.getmaxyx() == (30, 100)
+
+
+def test_null_renderer_default_size():
+    renderer = pymatrix.NullRenderer()
+    assert renderer.getmaxyx() == (24, 80)
+
+
+def test_null_renderer_no_input():
+    renderer = pymatrix.NullRenderer()
+    assert renderer.getch() == -1
+
+
+def test_null_renderer_is_term_resized():
+    renderer = pymatrix.NullRenderer(30, 100)
+    assert renderer.is_term_resized(30, 100) is False
+    assert renderer.is_term_resized(24, 80) is True
+
+
+def test_renderer_color_pair():
+    renderer = pymatrix.NullRenderer()
+    assert renderer.color_pair(0) == 0
+    assert renderer.color_pair(1) == 256
+    assert renderer.color_pair(10) == 2560
+
+
+def test_renderer_context_manager():
+    renderer = pymatrix.NullRenderer()
+    with mock.patch.object(renderer, "close") as mock_close:
+        with renderer as r:
+            assert r is renderer
+        assert mock_close.call_count == 1
+
+
+def test_recording_renderer_addstr():
+    renderer = pymatrix.RecordingRenderer(3, 5)
+    renderer.addstr(1, 2, "T", 256)
+    assert renderer.glyphs[1] == [" ", " ", "T", " ", " "]
+    assert renderer.attrs[1][2] == 256
+    assert renderer.writes == 1
+
+
+def test_recording_renderer_addstr_string():
+    renderer = pymatrix.RecordingRenderer(3, 5)
+    renderer.addstr(0, 1, "ABC", 0)
+    assert renderer.screenshot() == " ABC \n     \n     "
+
+
+def test_recording_renderer_refresh_counts_frames():
+    renderer = pymatrix.RecordingRenderer(3, 5)
+    renderer.refresh()
+    renderer.refresh()
+    assert renderer.frames == 2
+
+
+def test_recording_renderer_erase_uses_bkgd():
+    renderer = pymatrix.RecordingRenderer(2, 3)
+    renderer.addstr(0, 0, "T", 0)
+    renderer.bkgd("x", 256)
+    renderer.erase()
+    assert renderer.screenshot() == "xxx\nxxx"
+
+
+def test_recording_renderer_init_pair():
+    renderer = pymatrix.RecordingRenderer()
+    pymatrix.setup_curses_colors("green", "black", False, renderer.init_pair)
+    assert renderer.pairs[1] == (pymatrix.curses.COLOR_GREEN,
+                                 pymatrix.curses.COLOR_BLACK)
+    assert renderer.pairs[7] == (pymatrix.curses.COLOR_GREEN,
+                                 pymatrix.curses.COLOR_BLACK)
+
+
+def test_recording_renderer_lead_color():
+    renderer = pymatrix.RecordingRenderer()
+    pymatrix.curses_lead_color("blue", "black", True, renderer.init_pair)
+    assert renderer.pairs == {10: (21, 16)}
+
+
+def test_matrix_headless_run_timer():
+    args = pymatrix.argument_parsing(["--test_mode", "-R", "1", "-d0"])
+    renderer = pymatrix.RecordingRenderer(20, 40)
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(renderer, args)
+    assert renderer.frames > 1
+    assert renderer.writes > 0
+    assert matrix.line_list != []
+
+
+@pytest.fixture
+def ansi_renderer():
+    master, slave = pty.openpty()
+    with open(slave, "rb", buffering=0, closefd=False) as tty_file:
+        renderer = pymatrix.AnsiRenderer(stdin=tty_file, stdout=tty_file)
+        os.read(master, 1024)  # setup escape sequences
+        yield renderer, master
+        renderer.close()
+    os.close(slave)
+    os.close(master)
+
+
+def test_ansi_renderer_one_write_per_frame(ansi_renderer):
+    renderer, master = ansi_renderer
+    with mock.patch.object(pymatrix.os, "write",
+                           side_effect=lambda fd, data: len(data)) as m_write:
+        renderer.addstr(0, 0, "T", 0)
+        renderer.addstr(5, 3, "A", 256)
+        renderer.addstr(2, 1, "B", 0)
+        assert m_write.call_count == 0
+        renderer.refresh()
+        assert m_write.call_count == 1
+    assert renderer.buffer == bytearray()
+
+
+def test_ansi_renderer_output(ansi_renderer):
+    renderer, master = ansi_renderer
+    renderer.init_pair(1, 2, 0)
+    renderer.addstr(1, 2, "T", renderer.color_pair(1))
+    renderer.refresh()
+    assert os.read(master, 1024) == b"\033[2;3H\033[0;32;40mT"
+
+
+def test_ansi_renderer_skips_cursor_and_attr(ansi_renderer):
+    renderer, master = ansi_renderer
+    renderer.addstr(1, 2, "T", 0)
+    renderer.addstr(1, 3, "A", 0)
+    renderer.addstr(3, 3, "B", 0)
+    renderer.refresh()
+    assert os.read(master, 1024) == b"\033[2;3H\033[0mTA\033[4;4HB"
+
+
+def test_ansi_renderer_bold_italic(ansi_renderer):
+    renderer, master = ansi_renderer
+    renderer.init_pair(10, 255, 16)
+    attr = (renderer.color_pair(10) + pymatrix.curses.A_BOLD +
+            pymatrix.curses.A_ITALIC)
+    renderer.addstr(0, 0, "ﾎ", attr)
+    renderer.refresh()
+    assert os.read(master, 1024) == (
+        "\033[1;1H\033[0;1;3;38;5;255;48;5;16mﾎ".encode()
+    )
+
+
+def test_ansi_renderer_wide_glyph_cursor(ansi_renderer):
+    renderer, master = ansi_renderer
+    renderer.addstr(0, 0, "あ", 0)
+    assert renderer.cursor == (0, 2)
+    renderer.addstr(0, 2, "T", 0)
+    renderer.refresh()
+    assert os.read(master, 1024) == "\033[1;1H\033[0mあT".encode()
+
+
+def test_ansi_renderer_getch_no_input(ansi_renderer):
+    renderer, master = ansi_renderer
+    assert renderer.getch() == -1
+
+
+def test_ansi_renderer_getch(ansi_renderer):
+    renderer, master = ansi_renderer
+    os.write(master, b"q")
+    assert renderer.getch() == 113
+
+
+@pytest.mark.parametrize("sequence, expected", [
+    (b"\033[A", 259), (b"\033[B", 258), (b"\033[C", 261), (b"\033[D", 260),
+    (b"\033OA", 259), (b"\033", 27),
+])
+def test_ansi_renderer_getch_arrow_keys(ansi_renderer, sequence, expected):
+    renderer, master = ansi_renderer
+    os.write(master, sequence)
+    assert renderer.getch() == expected
+
+
+def test_ansi_renderer_fileno(ansi_renderer):
+    renderer, master = ansi_renderer
+    assert renderer.fileno() == renderer.in_fd
+
+
+def test_ansi_renderer_wait_key(ansi_renderer):
+    renderer, master = ansi_renderer
+    os.write(master, b"\033[A")
+    assert renderer.wait_key() == 259
+
+
+def test_ansi_renderer_wait_key_woken(ansi_renderer):
+    renderer, master = ansi_renderer
+    wake_read, wake_write = os.pipe()
+    try:
+        os.write(wake_write, b"x")
+        assert renderer.wait_key(wake_read) == pymatrix.KEY_WOKEN
+        os.set_blocking(wake_read, False)
+        with pytest.raises(BlockingIOError):
+            os.read(wake_read, 1)
+    finally:
+        os.close(wake_read)
+        os.close(wake_write)
+
+
+def test_ansi_renderer_suspend_resume(ansi_renderer):
+    renderer, master = ansi_renderer
+    renderer.addstr(1, 1, "T", 0)
+    renderer.refresh()
+    os.read(master, 1024)
+    renderer.suspend()
+    assert os.read(master, 1024) == b"\033[0m\033[?7h\033[?25h\033[?1049l"
+    renderer.resume()
+    assert os.read(master, 1024).startswith(b"\033[?1049h\033[?25l\033[?7l")
+    assert renderer.cursor is None
+
+
+def test_null_renderer_wait_key():
+    assert pymatrix.NullRenderer().wait_key() == -1
+
+
+def test_write_all_partial_writes():
+    chunks = []
+
+    def short_write(fd, data):
+        chunks.append(bytes(data[:3]))
+        return min(3, len(data))
+
+    with mock.patch.object(pymatrix.os, "write", side_effect=short_write):
+        pymatrix.write_all(1, b"abcdefgh")
+    assert chunks == [b"abc", b"def", b"gh"]
+
+
+def test_ansi_renderer_refresh_partial_writes(ansi_renderer):
+    renderer, master = ansi_renderer
+    renderer.addstr(0, 0, "TEST", 0)
+    real_write = os.write
+
+    def short_write(fd, data):
+        return real_write(fd, data[:3])
+
+    with mock.patch.object(pymatrix.os, "write", side_effect=short_write):
+        renderer.refresh()
+    assert renderer.buffer == b""
+    assert os.read(master, 1024) == b"\033[1;1H\033[0mTEST"
+
+
+def test_output_writer_writes_in_order():
+    read_fd, write_fd = os.pipe()
+    writer = pymatrix.OutputWriter(write_fd)
+    writer.submit(b"frame 1 ")
+    writer.submit(b"frame 2")
+    writer.drain()
+    assert writer.busy is False
+    writer.close()
+    assert not writer.thread.is_alive()
+    assert os.read(read_fd, 1024) == b"frame 1 frame 2"
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def test_output_writer_busy_while_writing():
+    read_fd, write_fd = os.pipe()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_write(fd, data):
+        started.set()
+        release.wait()
+        return len(data)
+
+    with mock.patch.object(pymatrix.os, "write", side_effect=slow_write):
+        writer = pymatrix.OutputWriter(write_fd)
+        writer.submit(b"x")
+        started.wait()
+        assert writer.busy is True
+        release.set()
+        writer.close()
+    assert writer.busy is False
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+@pytest.fixture
+def threaded_ansi_renderer():
+    master, slave = pty.openpty()
+    with open(slave, "rb", buffering=0, closefd=False) as tty_file:
+        renderer = pymatrix.AnsiRenderer(stdin=tty_file, stdout=tty_file,
+                                         threaded=True)
+        renderer.writer.drain()
+        os.read(master, 1024)  # setup escape sequences
+        yield renderer, master
+        renderer.close()
+    os.close(slave)
+    os.close(master)
+
+
+def test_threaded_ansi_renderer_output(threaded_ansi_renderer):
+    renderer, master = threaded_ansi_renderer
+    renderer.addstr(1, 2, "T", 0)
+    renderer.refresh()
+    assert renderer.buffer == bytearray()
+    renderer.writer.drain()
+    assert os.read(master, 1024) == b"\033[2;3H\033[0mT"
+    assert renderer.output_busy() is False
+
+
+def test_renderer_output_not_busy():
+    assert pymatrix.NullRenderer().output_busy() is False
@@ -0,0 +1,78 @@
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+
+
+def checksums(test_args):
+    args = pymatrix.argument_parsing(["--benchmark", "60", "--checksum"] +
+                                     test_args)
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.NullRenderer(20, 60), args)
+    return matrix.checksums
+
+
+def test_checksum_blank_buffers_match():
+    assert pymatrix.FrameBuffer(3, 4).checksum() == \
+           pymatrix.FrameBuffer(3, 4).checksum()
+
+
+def test_checksum_glyph_change():
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    blank = frame_buffer.checksum()
+    frame_buffer.put(1, 1, "A")
+    assert frame_buffer.checksum() != blank
+
+
+def test_checksum_attr_change():
+    frame_buffer = pymatrix.FrameBuffer(3, 4)
+    frame_buffer.put(1, 1, "A", 5)
+    first = frame_buffer.checksum()
+    frame_buffer.put(1, 1, "A", 6)
+    assert frame_buffer.checksum() != first
+
+
+def test_no_checksums_by_default():
+    args = pymatrix.argument_parsing(["--benchmark", "5"])
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.NullRenderer(), args)
+    assert matrix.checksums == []
+
+
+def test_checksum_every_frame():
+    assert len(checksums(["--seed", "1"])) == 60
+
+
+@pytest.mark.parametrize("test_args", [
+    [], ["-o"], ["--scroll_left", "-a"], ["-M", "-b"], ["-m", "-B"],
+])
+def test_same_seed_same_frames(test_args):
+    assert checksums(["--seed", "8"] + test_args) == \
+           checksums(["--seed", "8"] + test_args)
+
+
+def test_different_seed_different_frames():
+    assert checksums(["--seed", "8"]) != checksums(["--seed", "9"])
+
+
+@pytest.mark.parametrize("test_args", [
+    [], ["--reverse"], ["--scroll_right", "-M"], ["--scroll_left"],
+    ["--scroll_left", "-a"], ["-a", "-b"],
+])
+def test_arrays_engine_matches_lines_engine(test_args):
+    lines = checksums(["--seed", "2"] + test_args)
+    arrays = checksums(["--seed", "2", "--engine", "arrays"] + test_args)
+    assert lines == arrays
+
+
+def test_main_prints_checksums(capsys):
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        pymatrix.main(["--benchmark", "3", "--seed", "5", "--checksum"])
+    captured = capsys.readouterr().out.splitlines()
+    assert captured[-3].startswith("frame 1: ")
+    assert captured[-1].startswith("frame 3: ")
+    assert len(captured[-1].split(": ")[1]) == 8
@@ -0,0 +1,146 @@
+import os
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import build_state
+from tests.conftest import draw
+
+
+@pytest.fixture
+def engine():
+    engine = pymatrix.ShardedEngine("down", 10, 12, 2)
+    yield engine
+    engine.close()
+
+
+def test_add_routes_by_column(engine):
+    engine.add(0, 3)
+    engine.add(0, 4)
+    engine.add(0, 6)
+    assert engine.adds == [[(0, 4), (0, 6)], [(0, 3)]]
+    assert len(engine) == 3
+
+
+def test_add_routes_by_row_going_sideways():
+    engine = pymatrix.ShardedEngine("right", 10, 12, 2)
+    try:
+        engine.add(5, 0)
+        assert engine.adds == [[], [(5, 0)]]
+    finally:
+        engine.close()
+
+
+def test_draw_writes_leads(engine):
+    frame_buffer = pymatrix.FrameBuffer(12, 10)
+    engine.add(0, 3)
+    engine.add(0, 4)
+    state = build_state()
+    for _ in range(3):
+        draw(engine, frame_buffer)
+    for x in [3, 4]:
+        assert frame_buffer.glyphs[2 * 10 + x] == "A"
+        assert frame_buffer.attrs[2 * 10 + x] == state.lead[0]
+        assert frame_buffer.glyphs[1 * 10 + x] == "A"
+        assert frame_buffer.attrs[1 * 10 + x] in [color[0] for color
+                                                  in state.colors]
+    assert len(engine) == 2
+    assert engine.adds == [[], []]
+    assert sorted(set(frame_buffer.dirty)) == [
+        y * 10 + x for y in range(3) for x in [3, 4]
+    ]
+
+
+def test_draw_unicode_glyphs(engine):
+    frame_buffer = pymatrix.FrameBuffer(12, 10)
+    engine.add(0, 1)
+    draw(engine, frame_buffer, char_set=("ﾎ",))
+    assert frame_buffer.glyphs[1] == "ﾎ"
+
+
+def test_streams_finish_and_release_columns(engine):
+    frame_buffer = pymatrix.FrameBuffer(12, 10)
+    free_columns = pymatrix.ColumnPool()
+    free_columns.reset([])
+    engine.add(0, 3)
+    engine.add(0, 4)
+    for _ in range(40):
+        draw(engine, frame_buffer, free_columns, bg_char=".")
+    assert len(engine) == 0
+    assert sorted(free_columns) == [3, 4]
+    assert frame_buffer.glyphs[10 * 10 + 3] == "."
+
+
+def test_in_use(engine):
+    frame_buffer = pymatrix.FrameBuffer(12, 10)
+    engine.add(0, 3)
+    draw(engine, frame_buffer)
+    engine.add(0, 6)
+    assert engine.in_use() == {3, 6}
+
+
+def test_clear(engine):
+    frame_buffer = pymatrix.FrameBuffer(12, 10)
+    engine.add(0, 3)
+    draw(engine, frame_buffer)
+    engine.add(0, 4)
+    engine.clear("up")
+    assert len(engine) == 0
+    assert engine.in_use() == set()
+    frame_buffer = pymatrix.FrameBuffer(12, 10)
+    draw(engine, frame_buffer)
+    assert frame_buffer.dirty == []
+
+
+def test_close_frees_shared_memory():
+    engine = pymatrix.ShardedEngine("down", 10, 12, 2)
+    name = engine.glyph_memory.name
+    processes = list(engine.processes)
+    engine.close()
+    assert all(not process.is_alive() for process in processes)
+    assert not os.path.exists(f"/dev/shm/{name}")
+
+
+def test_matrix_with_workers():
+    args = pymatrix.argument_parsing(["--benchmark", "30", "--engine",
+                                      "arrays", "--workers", "2"])
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.RecordingRenderer(20, 40), args)
+    assert isinstance(matrix.streams, pymatrix.ShardedEngine)
+    assert matrix.streams.processes == []
+    assert len(matrix.stats.frame_times) == 30
+    assert matrix.stats.cells > 0
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_read_cells(engine, bulk):
+    if not bulk:
+        engine.glyph_array = engine.attr_array = None
+    elif engine.glyph_array is None:
+        pytest.skip("needs NumPy")
+    engine.glyph_grid[3] = ord("ﾎ")
+    engine.attr_grid[3] = 2 ** 40
+    engine.glyph_grid[7] = ord("A")
+    indices = pymatrix.array.array("i", [7, 3, 0])
+    glyphs, attrs = engine.read_cells(indices)
+    assert glyphs == "Aﾎ\0"
+    assert list(attrs) == [0, 2 ** 40, 0]
+    assert engine.read_cells(pymatrix.array.array("i")) == ("", [])
+
+
+def seeded_checksums(test_args):
+    args = pymatrix.argument_parsing(["--benchmark", "40", "--seed", "5",
+                                      "--checksum", "--engine", "arrays"] +
+                                     test_args)
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.NullRenderer(20, 40), args)
+    return matrix.checksums
+
+
+def test_seeded_workers_repeat_but_differ_from_arrays():
+    with_workers = seeded_checksums(["--workers", "2"])
+    assert with_workers == seeded_checksums(["--workers", "2"])
+    assert with_workers != seeded_checksums([])
@@ -0,0 +1,165 @@
+from unittest import mock
+
+import pytest
+
+from pymatrix import pymatrix
+from tests.conftest import draw
+
+
+def build_frame(width=10, height=10):
+    return pymatrix.FrameBuffer(height, width)
+
+
+@pytest.mark.parametrize("direction, expected", [
+    ("down", (True, 1, 8)), ("up", (True, -1, 8)),
+    ("right", (False, 1, 18)), ("left", (False, -1, 18)),
+])
+def test_set_direction(direction, expected):
+    engine = pymatrix.StreamEngine(direction, 20, 10)
+    assert (engine.vertical, engine.step, engine.last) == expected
+
+
+@pytest.mark.parametrize("direction, expected", [
+    ("down", (4, 0, -1, -5)), ("up", (4, 8, 9, 12)),
+    ("right", (2, 0, -1, -5)), ("left", (2, 18, 19, 23)),
+])
+def test_add(direction, expected):
+    engine = pymatrix.StreamEngine(direction, 20, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[3, 6, 5]):
+        engine.add(2, 4)
+    assert len(engine) == 1
+    assert (engine.cross[0], engine.lead[0], engine.head[0],
+            engine.tail[0]) == expected
+    assert engine.async_rate[0] == 3
+    assert engine.color[0] == 6
+    assert engine.length[0] == 5
+
+
+def test_clear():
+    engine = pymatrix.StreamEngine("down", 20, 10)
+    engine.add(0, 4)
+    engine.add(0, 5)
+    engine.clear("left")
+    assert len(engine) == 0
+    assert all(len(column) == 0 for column in engine.columns)
+    assert engine.direction == "left"
+
+
+def test_in_use():
+    engine = pymatrix.StreamEngine("down", 20, 10)
+    engine.add(0, 4)
+    engine.add(0, 7)
+    assert engine.in_use() == {4, 7}
+    engine.clear("right")
+    engine.add(3, 0)
+    assert engine.in_use() == set()
+
+
+def test_draw_down_first_frame():
+    engine = pymatrix.StreamEngine("down", 10, 10)
+    engine.add(0, 4)
+    frame_buffer = build_frame()
+    draw(engine, frame_buffer)
+    assert frame_buffer.dirty == [4]
+    assert frame_buffer.glyphs[4] == "A"
+    assert engine.lead[0] == 1
+    assert engine.head[0] == 0
+
+
+def test_draw_right_writes_along_row():
+    engine = pymatrix.StreamEngine("right", 10, 10)
+    engine.add(3, 0)
+    frame_buffer = build_frame()
+    draw(engine, frame_buffer)
+    draw(engine, frame_buffer)
+    assert frame_buffer.dirty == [30, 30, 31]
+
+
+def test_draw_returns_column_and_retires():
+    engine = pymatrix.StreamEngine("down", 10, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[0, 1, 3]):
+        engine.add(0, 4)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[0, 1, 5]):
+        engine.add(0, 6)
+    free_columns = pymatrix.ColumnPool()
+    frame_buffer = build_frame()
+    for _ in range(3):
+        draw(engine, frame_buffer, free_columns)
+    assert list(free_columns) == []
+    draw(engine, frame_buffer, free_columns)
+    assert list(free_columns) == [4]
+    for _ in range(8):
+        draw(engine, frame_buffer, free_columns)
+    assert 4 not in engine.cross
+
+
+def test_draw_do_not_clear():
+    engine = pymatrix.StreamEngine("down", 10, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[0, 1, 3]):
+        engine.add(0, 4)
+    frame_buffer = build_frame()
+    for _ in range(4):
+        draw(engine, frame_buffer, clear_tail=False)
+    assert " " not in [frame_buffer.glyphs[i] for i in frame_buffer.dirty]
+
+
+def test_draw_async_scroll_waits_turn():
+    engine = pymatrix.StreamEngine("down", 10, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[2, 1, 3]):
+        engine.add(0, 4)
+    frame_buffer = build_frame()
+    draw(engine, frame_buffer, async_scroll=True)
+    draw(engine, frame_buffer, async_scroll=True)
+    assert frame_buffer.dirty == []
+    draw(engine, frame_buffer, async_scroll=True)
+    assert frame_buffer.dirty == [4]
+
+
+def checksums(test_args):
+    args = pymatrix.argument_parsing(["--benchmark", "120", "--seed", "5",
+                                      "--checksum"] + test_args)
+    with mock.patch.object(pymatrix.OldScrollingLine,
+                           "old_scroll_chr_list", []):
+        matrix = pymatrix.Matrix(pymatrix.NullRenderer(20, 50), args)
+    return matrix.checksums
+
+
+@pytest.mark.parametrize("test_args", [
+    [], ["--reverse"], ["--scroll_right"], ["--scroll_left"], ["-a"],
+    ["-M", "-b"], ["-m", "-B"], ["-W"], ["-l"], ["--scroll_left", "-a"],
+])
+def test_matches_lines_engine(test_args):
+    lines = checksums(test_args)
+    arrays = checksums(test_args + ["--engine", "arrays"])
+    assert len(lines) == 120
+    assert lines == arrays
+
+
+def test_matrix_clear_lines():
+    args = pymatrix.argument_parsing(["--engine", "arrays"])
+    with mock.patch.object(pymatrix.Matrix, "main_loop"):
+        with mock.patch.object(pymatrix.OldScrollingLine,
+                               "old_scroll_chr_list", []):
+            matrix = pymatrix.Matrix(pymatrix.NullRenderer(), args)
+    matrix.streams = pymatrix.StreamEngine("down", 80, 24)
+    matrix.streams.add(0, 3)
+    matrix.dir = "right"
+    matrix.clear_lines()
+    assert len(matrix.streams) == 0
+    assert matrix.streams.direction == "right"
+
+
+def test_draw_async_count_kept_when_async_off():
+    engine = pymatrix.StreamEngine("down", 10, 10)
+    with mock.patch.object(pymatrix.random, "randint",
+                           side_effect=[2, 1, 3]):
+        engine.add(0, 4)
+    frame_buffer = build_frame()
+    draw(engine, frame_buffer, async_scroll=True)
+    draw(engine, frame_buffer)
+    assert engine.async_count[0] == 1
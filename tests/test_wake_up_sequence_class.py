@@ -0,0 +1,103 @@
+from unittest import mock
+
+from pymatrix import pymatrix
+from tests.conftest import build_matrix
+
+
+def screen_text(screen):
+    return "\n".join("".join(row) for row in screen.glyphs)
+
+
+def test_build_steps():
+    steps = pymatrix.WakeUpSequence.build_steps(1)
+    assert steps[0] == (0.0, "begin", ())
+    assert steps[1] == (3, "letter", (1, "W"))
+    assert steps[2] == (3.08, "letter", (2, "a"))
+    assert steps[-1][1] == "end"
+    assert [step[1] for step in steps].count("erase") == 4
+    times = [step[0] for step in steps]
+    assert times == sorted(times)
+
+
+def test_build_steps_total_time():
+    total = sum(len(text) * type_time + hold_time
+                for text, type_time, hold_time
+                in pymatrix.WakeUpSequence.MESSAGES) + 5
+    steps = pymatrix.WakeUpSequence.build_steps(1)
+    assert abs(steps[-1][0] - total) < 1e-9
+
+
+def test_advance_draws_due_steps(clock):
+    screen = pymatrix.RecordingRenderer(10, 40)
+    sequence = pymatrix.WakeUpSequence(clock=clock)
+    assert sequence.advance(screen) is True
+    assert screen_text(screen).strip() == ""
+    clock.now += 3.5
+    assert sequence.advance(screen) is True
+    assert "Wake up" in screen_text(screen)
+    refreshes = screen.frames
+    assert sequence.advance(screen) is True
+    assert screen.frames == refreshes  # nothing due, no refresh
+
+
+def test_advance_finishes(clock):
+    screen = pymatrix.RecordingRenderer(10, 40)
+    sequence = pymatrix.WakeUpSequence(test_mode=True, clock=clock)
+    clock.now += 60
+    assert sequence.advance(screen) is False
+    assert sequence.done
+
+
+def test_test_mode_is_shorter():
+    assert pymatrix.WakeUpSequence.build_steps(0.06)[-1][0] < \
+           pymatrix.WakeUpSequence.build_steps(1)[-1][0] / 10
+
+
+def test_matrix_rain_waits_during_wake_up():
+    matrix = build_matrix(screen=pymatrix.RecordingRenderer(20, 60))
+    matrix.draw_frame(0.0)
+    line_count = len(matrix.line_list)
+    matrix.start_wake_up()
+    with mock.patch.object(matrix, "add_lines") as m_add_lines:
+        assert matrix.draw_frame(0.0) is True
+    assert m_add_lines.call_count == 0
+    assert len(matrix.line_list) == line_count
+
+
+def test_matrix_key_skips_wake_up_and_restores_rain():
+    matrix = build_matrix(["--test_mode"], pymatrix.RecordingRenderer(20, 60))
+    for _ in range(20):
+        matrix.draw_frame(0.0)
+    rain = screen_text(matrix.screen)
+    matrix.start_wake_up()
+    matrix.wake_up.start_time -= 1
+    matrix.draw_frame(0.0)
+    assert screen_text(matrix.screen) != rain
+    matrix.screen.getch = mock.Mock(side_effect=[120, -1])
+    assert matrix.handle_input() is False
+    assert matrix.wake_up is None
+    assert screen_text(matrix.screen) == rain
+
+
+def test_matrix_q_quits_wake_up():
+    matrix = build_matrix(screen=pymatrix.RecordingRenderer(20, 60))
+    matrix.start_wake_up()
+    matrix.screen.getch = mock.Mock(side_effect=[113, -1])
+    assert matrix.handle_input() is True
+
+
+def test_matrix_wake_up_ends():
+    matrix = build_matrix(["--test_mode"], pymatrix.RecordingRenderer(20, 60))
+    matrix.start_wake_up()
+    matrix.wake_up.start_time -= 60
+    matrix.draw_frame(0.0)
+    assert matrix.wake_up is None
+
+
+def test_matrix_wake_up_keys_start_sequence():
+    matrix = build_matrix(screen=pymatrix.RecordingRenderer(20, 60))
+    matrix.screen.getch = mock.Mock(side_effect=[119, 65, 107, 101, 98, -1])
+    with mock.patch.object(pymatrix.time, "sleep"):
+        matrix.handle_input()
+    assert isinstance(matrix.wake_up, pymatrix.WakeUpSequence)
+    assert matrix.args.bold_on is False  # keys after the sequence dropped